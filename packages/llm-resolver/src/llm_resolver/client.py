@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import logging
 import os
+import threading
 from typing import Any, cast
 
 from pydantic import BaseModel
@@ -16,6 +17,26 @@ def _load_openai() -> Any:
     return OpenAI
 
 
+_openai_clients: dict[tuple[Any, ...], Any] = {}
+_openai_clients_lock = threading.Lock()
+
+
+def _openai_client(api_key: str | None, base_url: str | None) -> Any:
+    """
+    Shared OpenAI client per credentials/endpoint, so every call (and every reflect pass) reuses one
+    connection pool instead of paying a new TLS handshake. OpenAI clients are thread-safe.
+    """
+    OpenAI = _load_openai()
+    # With no explicit key/base the client reads them from the environment at construction.
+    cache_key = (OpenAI, api_key, base_url, os.getenv("OPENAI_API_KEY"), os.getenv("OPENAI_BASE_URL"))
+    with _openai_clients_lock:
+        client = _openai_clients.get(cache_key)
+        if client is None:
+            client = OpenAI(base_url=base_url) if api_key is None else OpenAI(api_key=api_key, base_url=base_url)
+            _openai_clients[cache_key] = client
+    return client
+
+
 def _load_litellm_completion() -> Any:
     from litellm import completion  # type: ignore[import-not-found]
 
@@ -300,8 +321,9 @@ class LiteLLMChatClient:
                     attempt + 1,
                     str(last_err),
                 )
+                # Shallow: the earlier messages (and their image data URLs) are shared, not copied.
                 input_payload = [
-                    *list(input_payload),
+                    *input_payload,
                     {
                         "role": "user",
                         "content": [
@@ -338,8 +360,7 @@ class LiteLLMChatClient:
             if self._use_claude_fallback:
                 raise RuntimeError(f"Missing API key env var {self._api_key_env!r} for model={model!r}.")
             if provider in {"openai", "gemini"}:
-                OpenAI = _load_openai()
-                client = OpenAI(base_url=base) if key is None else OpenAI(api_key=key, base_url=base)
+                client = _openai_client(key, base)
                 if reasoning is not None:
                     resp = client.responses.create(
                         model=self._strip_provider_prefix(model),
@@ -389,8 +410,7 @@ class LiteLLMChatClient:
             return response_model_t.model_validate(parsed)
 
         if provider == "openai":
-            OpenAI = _load_openai()
-            client = OpenAI(base_url=base) if key is None else OpenAI(api_key=key, base_url=base)
+            client = _openai_client(key, base)
             resp = self._responses_parse_with_retries(
                 where=f"Structured parse {response_model_t.__name__}",
                 client=client,
@@ -25,15 +25,18 @@ class KeyablePanel(AppKit.NSPanel):  # type: ignore[misc]
         return False
 
 
-def active_screen_visible_frame() -> tuple[float, float, float, float]:
+def mouse_location() -> tuple[float, float]:
+    """Return the mouse cursor position in global screen coordinates (points)."""
+    mouse = AppKit.NSEvent.mouseLocation()
+    return float(getattr(mouse, "x", 0.0)), float(getattr(mouse, "y", 0.0))
+
+
+def screen_visible_frame_at(mx: float, my: float) -> tuple[float, float, float, float]:
     """
-    Return (sx, sy, sw, sh) for the visible frame of the screen under the mouse cursor.
+    Return (sx, sy, sw, sh) for the visible frame of the screen containing (mx, my).
     Falls back to mainScreen/defaults.
     """
     try:
-        mouse = AppKit.NSEvent.mouseLocation()
-        mx = float(getattr(mouse, "x", 0.0))
-        my = float(getattr(mouse, "y", 0.0))
         for s in (AppKit.NSScreen.screens() or []):
             fr = s.frame()
             (fx, fy), (fw, fh) = fr  # type: ignore[misc]
@@ -49,6 +52,45 @@ def active_screen_visible_frame() -> tuple[float, float, float, float]:
         return 0.0, 0.0, 1440.0, 900.0
 
 
+def active_screen_visible_frame() -> tuple[float, float, float, float]:
+    """
+    Return (sx, sy, sw, sh) for the visible frame of the screen under the mouse cursor.
+    Falls back to mainScreen/defaults.
+    """
+    try:
+        mx, my = mouse_location()
+    except Exception:
+        return 0.0, 0.0, 1440.0, 900.0
+    return screen_visible_frame_at(mx, my)
+
+
+# NSActivityUserInitiated without NSActivityIdleSystemSleepDisabled (bit 20): the display and
+# system may still idle-sleep, but App Nap won't throttle this process's timers.
+_USER_ACTIVITY_OPTIONS = 0x00FFFFFF & ~(1 << 20)
+
+
+def begin_user_activity(reason: str) -> Any:
+    """
+    Opt the process out of App Nap while a recording is in progress. Returns a token for
+    end_user_activity(), or None if the activity could not be started.
+    """
+    try:
+        options = getattr(AppKit, "NSActivityUserInitiatedAllowingIdleSystemSleep", _USER_ACTIVITY_OPTIONS)
+        return AppKit.NSProcessInfo.processInfo().beginActivityWithOptions_reason_(options, reason)
+    except Exception:
+        return None
+
+
+def end_user_activity(token: Any) -> None:
+    """End an activity started by begin_user_activity() (None is ignored)."""
+    if token is None:
+        return
+    try:
+        AppKit.NSProcessInfo.processInfo().endActivity_(token)
+    except Exception:
+        pass
+
+
 def sys_font(size: float, weight: float | None = None) -> Any:
     try:
         if weight is not None:
@@ -75,8 +117,15 @@ def theme_colors() -> dict[str, Any]:
         return {"title": None, "secondary": None, "body": None}
 
 
+# Resolved on first use and shared by every small button (same size/weight everywhere).
+_small_button_font: Any = None
+
+
 def style_small_button(btn: Any) -> Any:
-    w_semibold, w_medium = font_weights()
+    global _small_button_font
+    if _small_button_font is None:
+        _w_semibold, w_medium = font_weights()
+        _small_button_font = sys_font(11.0, w_medium)
     try:
         btn.setBezelStyle_(AppKit.NSBezelStyleRounded)  # type: ignore[attr-defined]
     except Exception:
@@ -86,7 +135,7 @@ def style_small_button(btn: Any) -> Any:
     except Exception:
         pass
     try:
-        btn.setFont_(sys_font(11.0, w_medium))
+        btn.setFont_(_small_button_font)
     except Exception:
         pass
     return btn
@@ -1,36 +1,116 @@
 from pynput import mouse, keyboard
+import logging
 import time
 import threading
-import os
-from pathlib import Path
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from queue import Empty
-from ai_mime.screenshot import ScreenshotRecorder
+from typing import Any, Callable
+import Quartz  # type: ignore[import-not-found]
+from ai_mime.screenshot import RawFrame, ScreenshotRecorder
+
+# Key constants resolved once at import; the listener callbacks compare against these per keystroke.
+_Key = keyboard.Key
+
+# Modifier state is a bitmask; _MOD_CMD must stay 1 so (modifiers & _MOD_CMD) can offset an action code.
+_MOD_CMD = 1
+_MOD_CTRL = 2
+_MOD_ALT = 4
+_MOD_SHIFT = 8
+_MOD_MASK = {
+    _Key.cmd: _MOD_CMD, _Key.cmd_l: _MOD_CMD, _Key.cmd_r: _MOD_CMD,
+    _Key.ctrl: _MOD_CTRL, _Key.ctrl_l: _MOD_CTRL, _Key.ctrl_r: _MOD_CTRL,
+    _Key.alt: _MOD_ALT, _Key.alt_l: _MOD_ALT, _Key.alt_r: _MOD_ALT,
+    _Key.shift: _MOD_SHIFT, _Key.shift_l: _MOD_SHIFT, _Key.shift_r: _MOD_SHIFT,
+}
+
+# Key action codes; they index EventRecorder._key_handlers. Keys not in _KEY_ACTION are _ACT_CHAR.
+# _ACT_CMD_SPACE must equal _ACT_SPACE + _MOD_CMD (space with Cmd held).
+_ACT_CHAR = 0
+_ACT_SPECIAL = 1
+_ACT_ERASE = 2
+_ACT_SPACE = 3
+_ACT_CMD_SPACE = 4
+_KEY_ACTION = {
+    _Key.enter: _ACT_SPECIAL, _Key.tab: _ACT_SPECIAL, _Key.esc: _ACT_SPECIAL, _Key.f4: _ACT_SPECIAL,
+    _Key.backspace: _ACT_ERASE, _Key.delete: _ACT_ERASE,
+    _Key.space: _ACT_SPACE,
+}
+# Manifest names for _ACT_SPECIAL keys (what str(key).replace("Key.", "").upper() produced).
+_KEY_NAMES = {_Key.enter: "ENTER", _Key.tab: "TAB", _Key.esc: "ESC", _Key.f4: "F4"}
+
+# Sentinel that tells the writer thread to drain and exit.
+_WRITER_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+
+class _LogThrottle:
+    """Let a repeating log line through at most once per interval_s, counting what was suppressed."""
+
+    def __init__(self, interval_s: float = 10.0):
+        self.interval_s = interval_s
+        self._next_ts = 0.0
+        self._suppressed = 0
+
+    def ready(self) -> int | None:
+        """Return the number of suppressed calls if this one may log, else None."""
+        now = time.monotonic()
+        if now < self._next_ts:
+            self._suppressed += 1
+            return None
+        self._next_ts = now + self.interval_s
+        suppressed, self._suppressed = self._suppressed, 0
+        return suppressed
+
 
 class CurrentScreenshotUpdater:
     """
-    Continuously captures the primary display to screenshots/current_screenshot.png.
-    Writes are made atomic by capturing to a temp file and os.replace()ing into place.
+    Keeps the most recent screen capture in memory, capturing on demand:
+    after each recorded action (force_refresh) and whenever a freeze finds the frame stale.
+    A slow periodic capture (interval_s) is kept only as a safety net; idle periods cost nothing.
+    The updater only publishes RawFrames; it never encodes. The recorder's writer thread encodes
+    frozen frames to their reserved screenshot paths.
     """
     def __init__(
         self,
         screenshot_recorder: ScreenshotRecorder,
         storage,
-        interval_s: float = 0.5,
+        interval_s: float = 5.0,
         *,
         exclude_window_id: int | None = None,
+        max_age_s: float = 0.15,
     ):
         self.screenshot_recorder = screenshot_recorder
         self.storage = storage
         self.interval_s = interval_s
+        # A frame younger than this is reused as-is; older frames are recaptured before freezing.
+        self.max_age_s = max_age_s
+        # Monotonic time of the last force_refresh(): a frame whose capture started before it
+        # predates the last recorded action, so it is stale regardless of its age.
+        self._refresh_requested_ts = 0.0
         self.exclude_window_id = exclude_window_id
         self._stop_event = threading.Event()
         self._thread = None
-        self._capture_lock = threading.Lock()
+        # Single-slot (frame, monotonic capture time), published by one attribute assignment
+        # (atomic under the GIL), so readers never take a lock or see a frame/timestamp mismatch.
+        self._latest: tuple[RawFrame, float] | None = None
+        # All captures run on one worker so callers never run mss/Quartz themselves;
+        # concurrent requests share the capture already queued (or running, for freezes).
+        self._capture_executor: ThreadPoolExecutor | None = None
+        self._inflight: Future | None = None
+        self._inflight_lock = threading.Lock()
+        self._capture_wait_s = 1.0
+        # Monotonic time of the last capture attempt (drives the periodic safety net).
+        self._last_attempt_ts = 0.0
+        self._error_log = _LogThrottle()
 
     def start(self):
         if self._thread and self._thread.is_alive():
             return
         self._stop_event.clear()
+        if self._capture_executor is None:
+            self._capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cap")
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
 
@@ -38,64 +118,101 @@ class CurrentScreenshotUpdater:
         self._stop_event.set()
         if self._thread:
             self._thread.join(timeout=timeout)
+        with self._inflight_lock:
+            executor = self._capture_executor
+            self._capture_executor = None
+            self._inflight = None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
 
     def force_refresh(self):
-        """Capture immediately (atomic replace)."""
-        self._capture_once()
+        """
+        Schedule a capture on the capture worker and return immediately.
+        Requests arriving before that capture starts are coalesced into one. Until it lands, the
+        current frame counts as stale, so the next freeze waits for it instead of reusing the old one.
+        """
+        self._refresh_requested_ts = time.monotonic()
+        self._request_capture(join_running=False)
+
+    def _request_capture(self, *, join_running: bool) -> Future:
+        """
+        Return a future for a capture that has not finished yet.
 
-    def freeze_current(self, filename: str | None = None):
+        A capture that is queued but not started is always shared. A running capture is only
+        shared when join_running is True (freezes accept a frame taken just before the call;
+        refreshes want one that starts after it).
         """
-        Freeze the most recent current screenshot into the numbered screenshots dir.
-        Uses the same lock as writer so read/copy never races with os.replace().
+        with self._inflight_lock:
+            fut = self._inflight
+            if fut is not None and not fut.done() and (join_running or not fut.running()):
+                return fut
+            executor = self._capture_executor
+            if executor is None:
+                # Not started (or already stopped): capture inline.
+                fut = Future()
+                fut.set_result(self._capture_once())
+                return fut
+            fut = executor.submit(self._capture_once)
+            self._inflight = fut
+            return fut
+
+    def _ensure_fresh(self) -> None:
         """
-        with self._capture_lock:
-            dest_path = Path(self.storage.get_current_screenshot_path())
-            if not dest_path.exists():
-                self._capture_once()
-            return self.storage.freeze_screenshot(dest_path, filename=filename)
+        Block (bounded) until a fresh frame exists, capturing on the worker if needed.
+        After force_refresh() the in-flight capture started after the request, so joining it
+        (even while running) yields a frame that reflects the last action.
+        """
+        if self.is_fresh():
+            return
+        try:
+            self._request_capture(join_running=True).result(timeout=self._capture_wait_s)
+        except (FutureTimeoutError, CancelledError):
+            # Timed out, or cancelled by a concurrent stop(): fall back to the last frame we have.
+            pass
 
-    def copy_current_to(self, dst_path):
+    def is_fresh(self) -> bool:
+        """True if the current frame was captured less than max_age_s ago and after the last refresh request."""
+        latest = self._latest
+        if latest is None or latest[1] < self._refresh_requested_ts:
+            return False
+        return time.monotonic() - latest[1] < self.max_age_s
+
+    def latest_frame(self) -> RawFrame | None:
         """
-        Copy the most recent current screenshot to dst_path safely under the writer lock.
+        Return the most recent frame (recaptured first if stale), or None if nothing was captured.
+        Frames are immutable once published, so callers may encode them on any thread.
         """
-        with self._capture_lock:
-            src_path = Path(self.storage.get_current_screenshot_path())
-            if not src_path.exists():
-                self._capture_once()
-            return self.storage.copy_file(src_path, dst_path)
+        self._ensure_fresh()
+        latest = self._latest
+        return latest[0] if latest is not None else None
 
     def _run(self):
-        # Capture immediately so we have a current frame available ASAP.
-        self._capture_once()
+        # Periodic safety net: capture once interval_s has passed since the last capture attempt
+        # (captures requested by events reset the schedule). The first pass captures immediately.
         while not self._stop_event.is_set():
-            # Sleep first to avoid a tight loop if capture fails quickly.
-            self._stop_event.wait(self.interval_s)
-            if self._stop_event.is_set():
-                break
-            self._capture_once()
+            wait_s = self.interval_s - (time.monotonic() - self._last_attempt_ts)
+            if wait_s > 0:
+                self._stop_event.wait(min(self.interval_s, wait_s))
+                continue
+            try:
+                self._request_capture(join_running=True).result(timeout=self.interval_s + self._capture_wait_s)
+            except Exception:
+                pass
 
     def _capture_once(self):
-        # Ensure captures + replaces aren't overlapped (also used by force_refresh).
-        with self._capture_lock:
-            dest_path = Path(self.storage.get_current_screenshot_path())
-            # Keep a .png suffix so mss reliably writes PNG.
-            tmp_path = dest_path.with_suffix(".tmp.png")
-            try:
-                # Capture to temp path first.
-                saved_tmp = self.screenshot_recorder.capture(tmp_path, exclude_window_id=self.exclude_window_id)
-                if not saved_tmp:
-                    return None
-                # Atomic swap into place.
-                os.replace(str(tmp_path), str(dest_path))
-                return str(dest_path)
-            except Exception as e:
-                print(f"Current screenshot update failed: {e}")
-                try:
-                    if tmp_path.exists():
-                        tmp_path.unlink()
-                except Exception:
-                    pass
+        """Grab the screen into memory and publish it as the latest frame."""
+        self._last_attempt_ts = time.monotonic()
+        try:
+            frame = self.screenshot_recorder.grab(exclude_window_id=self.exclude_window_id)
+            if frame is None:
                 return None
+            self._latest = (frame, self._last_attempt_ts)
+            return frame
+        except Exception as e:
+            suppressed = self._error_log.ready()
+            if suppressed is not None:
+                logger.warning("Current screenshot update failed: %s (%d similar suppressed)", e, suppressed)
+            return None
 
 class EventRecorder:
     def __init__(
@@ -110,37 +227,76 @@ class EventRecorder:
         self.screenshot_recorder = ScreenshotRecorder()
         self.exclude_window_id = exclude_window_id
 
-        # Typing State
-        self.type_buf = []
-        self.type_screenshot = None
+        # Typing State: UTF-8 bytes of the current burst; only type_buf[:type_len] is live.
+        # The buffer is reused across bursts and doubles when full.
+        self.type_buf = bytearray(4096)
+        self.type_len = 0
+        self.type_screenshot: RawFrame | None = None  # pre-typing frame, held until the burst is flushed
 
-        # Throttling
-        self.last_scroll_time = 0
-        self.scroll_throttle = 0.5
+        # Scroll coalescing: a burst freezes its pre-action frame on the first tick, accumulates
+        # dx/dy, and is emitted as one event once no scroll arrives for _scroll_quiet_s (monotonic
+        # clock; wall-clock time is only used for event timestamps) or another event needs to go first.
+        self._scroll_quiet_s = 0.25
+        self._pending_scroll_lock = threading.Lock()
+        self._pending_scroll: dict | None = None
+        self._scroll_timer: threading.Timer | None = None
 
         self.recording = False
         self.mouse_listener = None
         self.keyboard_listener = None
-        self.modifiers = set() # Track active modifiers
+        self.modifiers = 0 # Bitmask of held modifiers (_MOD_*)
         self.paused = False
         self.pending_details: str | None = None
         self.refine_cmd_q = refine_cmd_q
         self.refine_resp_q = refine_resp_q
         self._refine_thread = None
+        # Refine queue waits are long: stop() wakes them with a None item, so this is only a safety net.
+        self._refine_wait_s = 5.0
+        # Indexed by _ACT_* code.
+        self._key_handlers: tuple[Callable[[Any], None], ...] = (
+            self._on_char_key,
+            self._on_special_key,
+            self._on_erase_key,
+            self._on_space_key,
+            self._on_cmd_space,
+        )
 
         # Double-click buffering: we delay emitting a single click briefly so we can collapse
         # two close clicks into a single double_click event.
         self._double_click_max_interval_s = 0.35
         self._double_click_max_dist_px = 8.0
+        self._double_click_max_dist_sq = self._double_click_max_dist_px ** 2
         self._pending_click_lock = threading.Lock()
         self._pending_click: dict | None = None
         self._pending_click_timer: threading.Timer | None = None
 
-        # Current screenshot updater (overwrites current_screenshot.png every 500ms)
+        # Disk work (PNG encodes, manifest appends) happens on a dedicated writer
+        # thread so listener callbacks never block on I/O. One FIFO queue keeps every screenshot
+        # written before the manifest line that references it.
+        self._write_q: deque = deque()
+        self._write_cv = threading.Condition()
+        self._writer: threading.Thread | None = None
+        self._event_batch_max = 64
+        # A batch is written (and fsynced) once it is full or this long after its first event,
+        # so a burst shares one write+fsync; a crash loses at most this window of events (plus one
+        # screenshot encode, since the deadline is checked between queued items).
+        self._event_linger_s = 0.05
+        # Events are never dropped, but raw frames are large: if the disk stalls, at most this many
+        # frame encodes stay queued and the oldest is dropped (its events get screenshot=None).
+        self._max_queued_frames = 16
+        self._queued_frames = 0
+        # Manifest-relative screenshot paths the writer failed to produce (writer thread only).
+        self._failed_screenshots: set[str] = set()
+        self._drop_log = _LogThrottle()
+        self._encode_log = _LogThrottle()
+        self._event_write_log = _LogThrottle()
+
+        # Current screenshot updater (keeps the latest frame in memory; refreshed after actions / when stale)
         self.current_updater = CurrentScreenshotUpdater(
             screenshot_recorder=self.screenshot_recorder,
             storage=self.storage,
-            interval_s=0.5,
+            interval_s=5.0,
+            max_age_s=0.15,
             exclude_window_id=self.exclude_window_id,
         )
 
@@ -150,10 +306,12 @@ class EventRecorder:
         self.recording = True
 
         print("Starting listeners...")
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
         # Start current screenshot updater first so we always have a recent pre-action frame.
+        # It captures immediately on start; an event that arrives before that first frame exists
+        # waits (bounded) for it.
         self.current_updater.start()
-        # Best-effort ensure at least one current frame exists before any first event.
-        self.current_updater.force_refresh()
 
         # Blocking=False (default).
         self.mouse_listener = mouse.Listener(
@@ -178,8 +336,9 @@ class EventRecorder:
 
         # Flush while recording is still True so a final buffered click isn't dropped.
         self.paused = False
-        self.flush_typing()
+        self.flush_typing(refresh=False)
         self._flush_pending_click()
+        self._flush_pending_scroll()
 
         self.recording = False
 
@@ -187,12 +346,29 @@ class EventRecorder:
         self.current_updater.stop()
 
         if self._refine_thread is not None:
+            # The refine thread blocks on the queues with a long timeout; wake it so it sees recording=False.
+            for q in (self.refine_cmd_q, self.refine_resp_q):
+                try:
+                    q.put(None)
+                except Exception:
+                    pass
             try:
                 self._refine_thread.join(timeout=1.0)
             except Exception:
                 pass
             self._refine_thread = None
 
+        # All producers are stopped; drain queued screenshots and events to disk.
+        writer_done = True
+        if self._writer is not None:
+            self._enqueue_write(_WRITER_STOP)
+            self._writer.join(timeout=5.0)
+            writer_done = not self._writer.is_alive()
+            self._writer = None
+        # A writer stuck on a stalled disk still owns the manifest handle; leave it to exit.
+        if writer_done:
+            self.storage.close_session()
+
     def _start_refine_listener(self):
         if self._refine_thread is not None:
             return
@@ -204,7 +380,7 @@ class EventRecorder:
         def _run():
             while self.recording:
                 try:
-                    cmd = cmd_q.get(timeout=0.01)
+                    cmd = cmd_q.get(timeout=self._refine_wait_s)
                 except Empty:
                     continue
                 except Exception:
@@ -215,7 +391,7 @@ class EventRecorder:
                     continue
                 try:
                     kind = str(cmd.get("kind") or "")
-                    req_id = float(cmd.get("req_id") or 0.0)
+                    req_id = int(cmd.get("req_id") or 0)
                 except Exception:
                     continue
                 if req_id <= 0:
@@ -225,7 +401,7 @@ class EventRecorder:
         self._refine_thread = threading.Thread(target=_run, daemon=True)
         self._refine_thread.start()
 
-    def _handle_begin_refine(self, *, kind: str, req_id: float) -> None:
+    def _handle_begin_refine(self, *, kind: str, req_id: int) -> None:
         if self.paused:
             return
         if self.refine_resp_q is None:
@@ -233,6 +409,7 @@ class EventRecorder:
         resp_q = self.refine_resp_q
 
         self._flush_pending_click()
+        self._flush_pending_scroll()
         self.flush_typing()
         screenshot = self._freeze_current_screenshot()
         self.paused = True
@@ -240,7 +417,7 @@ class EventRecorder:
         resp = None
         while self.recording and self.paused and resp is None:
             try:
-                candidate = resp_q.get(timeout=0.05)
+                candidate = resp_q.get(timeout=self._refine_wait_s)
             except Empty:
                 continue
             except Exception:
@@ -262,7 +439,7 @@ class EventRecorder:
                         "action_type": "extract",
                         "action_details": {"query": query, "values": values},
                         "screenshot": screenshot,
-                        "timestamp": time.time(),
+                        "timestamp": self.storage.timestamp(),
                     }
                 )
         elif rkind == "details":
@@ -279,8 +456,6 @@ class EventRecorder:
         Used to avoid recording clicks on the recording overlay itself.
         """
         try:
-            import Quartz  # type: ignore[import-not-found]
-
             info = Quartz.CGWindowListCopyWindowInfo(  # type: ignore[attr-defined]
                 Quartz.kCGWindowListOptionOnScreenOnly,  # type: ignore[attr-defined]
                 Quartz.kCGNullWindowID,  # type: ignore[attr-defined]
@@ -302,42 +477,148 @@ class EventRecorder:
         return False
 
     def _freeze_current_screenshot(self):
-        """Freeze the most recent pre-action current screenshot into the numbered screenshots/ dir."""
-        return self.current_updater.freeze_current()
+        """
+        Freeze the most recent pre-action frame into the numbered screenshots/ dir.
+        The path is reserved here; the writer thread encodes the frame. Returns the manifest path.
+        """
+        frame = self.current_updater.latest_frame()
+        if frame is None:
+            return None
+        dst_path, rel_path = self.storage.reserve_screenshot_path()
+        self._enqueue_write((frame, dst_path))
+        return rel_path
 
     def _capture_pretyping_screenshot(self):
-        """Copy current screenshot into a stable pretyping file (overwritten per typing burst)."""
-        pretyping_path = self.storage.get_pretyping_screenshot_path()
-        self.current_updater.copy_current_to(pretyping_path)
-        self.type_screenshot = pretyping_path
+        """Keep the current frame in memory as the typing burst's pre-action frame."""
+        self.type_screenshot = self.current_updater.latest_frame()
 
     def _write_event(self, event_data: dict):
         """
         Centralized event write:
         - always sets voice_clip to None (audio disabled)
         - injects pending 'details' onto the next event if present
+        The manifest record is built in one dict display with a fixed key order.
         """
-        event_data.setdefault("voice_clip", None)
-        event_data.setdefault("details", None)
-        if self.pending_details:
-            event_data["details"] = self.pending_details
+        details = self.pending_details
+        if details:
             self.pending_details = None
-        self.storage.write_event(event_data)
+        self._enqueue_write({**event_data, "voice_clip": None, "details": details or None})
+
+    def _enqueue_write(self, item) -> None:
+        """Hand an event, screenshot job or _WRITER_STOP to the writer thread (never blocks on I/O)."""
+        with self._write_cv:
+            q = self._write_q
+            if type(item) is tuple and isinstance(item[0], RawFrame):
+                if self._queued_frames >= self._max_queued_frames:
+                    # Drop the oldest queued frame but keep its slot, so FIFO order still holds.
+                    for i, queued in enumerate(q):
+                        if type(queued) is tuple and isinstance(queued[0], RawFrame):
+                            q[i] = (None, queued[1])
+                            self._queued_frames -= 1
+                            break
+                self._queued_frames += 1
+            q.append(item)
+            self._write_cv.notify()
+
+    def _writer_loop(self):
+        """
+        Drain the write queue in FIFO order. Screenshot jobs are (frame, dst_path) tuples to encode;
+        events are appended to the manifest in batches (up to _event_batch_max events or
+        _event_linger_s after the first one, whichever comes first, even while encodes are queued),
+        so a burst costs one write+fsync instead of one each.
+        """
+        q = self._write_q
+        cv = self._write_cv
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = 0.0
+            while True:
+                with cv:
+                    while not q:
+                        if not batch:
+                            cv.wait()
+                            continue
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        cv.wait(remaining)
+                    if not q:
+                        break
+                    if batch and time.monotonic() >= deadline:
+                        # Linger expired behind queued encodes: write the batch before the next one.
+                        break
+                    item = q.popleft()
+                    if type(item) is tuple and isinstance(item[0], RawFrame):
+                        self._queued_frames -= 1
+                if item is _WRITER_STOP:
+                    stopping = True
+                    break
+                if isinstance(item, dict):
+                    batch.append(item)
+                    if len(batch) == 1:
+                        deadline = time.monotonic() + self._event_linger_s
+                    if len(batch) >= self._event_batch_max:
+                        break
+                else:
+                    self._write_screenshot(*item)
+            if not batch:
+                continue
+            failed = self._failed_screenshots
+            if failed:
+                for event in batch:
+                    if event.get("screenshot") in failed:
+                        event["screenshot"] = None
+            try:
+                self.storage.write_events(batch, sync=True)
+            except Exception as e:
+                suppressed = self._event_write_log.ready()
+                if suppressed is not None:
+                    logger.warning("Event write failed (%d events dropped): %s (%d similar suppressed)", len(batch), e, suppressed)
 
-    def flush_typing(self):
-        """Flush buffered typing events."""
-        if not self.type_buf:
+    def _write_screenshot(self, frame, dst_path) -> None:
+        """
+        Writer thread: encode a frame to dst_path, remembering failures.
+        frame is None for a frame dropped from a full queue.
+        """
+        if frame is None:
+            suppressed = self._drop_log.ready()
+            if suppressed is not None:
+                logger.warning("Screenshot dropped (write queue full): %s (%d similar suppressed)", dst_path, suppressed)
+            saved = None
+        else:
+            try:
+                saved = self.screenshot_recorder.save_frame(frame, dst_path)
+            except Exception as e:
+                suppressed = self._encode_log.ready()
+                if suppressed is not None:
+                    logger.warning("Screenshot encode failed (%s): %s (%d similar suppressed)", dst_path, e, suppressed)
+                saved = None
+        if not saved:
+            self._failed_screenshots.add(self.storage.get_relative_path(dst_path))
+
+    def flush_typing(self, *, refresh: bool = True, now: float | None = None):
+        """
+        Flush buffered typing events, then refresh the current frame so it shows the typed text.
+        An action recorded right after the flush freezes that post-typing capture (the refresh
+        marks the older frame stale). Pass refresh=False only when nothing is recorded afterwards;
+        pass now to reuse the caller's timestamp.
+        """
+        if not self.type_len:
             return
+        if now is None:
+            now = self.storage.timestamp()
 
-        text = "".join(self.type_buf)
-        self.type_buf = []
+        text = self.type_buf[:self.type_len].decode("utf-8", "surrogatepass")
+        self.type_len = 0
 
         # For typing, the screenshot must represent the pre-typing state.
-        # We store a "pretyping_screenshot.png" at typing burst start and freeze from that.
-        pretyping_path = self.type_screenshot
+        # The frame was kept in memory at typing burst start; encode it straight to {N}.png.
+        frame = self.type_screenshot
         self.type_screenshot = None
-        if pretyping_path:
-            screenshot = self.storage.freeze_screenshot(pretyping_path)
+        if frame is not None:
+            dst_path, screenshot = self.storage.reserve_screenshot_path()
+            self._enqueue_write((frame, dst_path))
         else:
             # Fallback: freeze current (best-effort) if we missed typing-burst start.
             screenshot = self._freeze_current_screenshot()
@@ -346,11 +627,12 @@ class EventRecorder:
             "action_type": "type",
             "action_details": {"text": text},
             "screenshot": screenshot,
-            "timestamp": time.time()
+            "timestamp": now
         })
 
         # After typing, refresh current screenshot so subsequent actions see the typed result quickly.
-        self.current_updater.force_refresh()
+        if refresh:
+            self.current_updater.force_refresh()
 
     def _cancel_pending_click_timer(self) -> None:
         t = self._pending_click_timer
@@ -400,12 +682,18 @@ class EventRecorder:
             x=float(pending.get("x") or 0.0),
             y=float(pending.get("y") or 0.0),
             screenshot=str(pending.get("screenshot") or ""),
-            timestamp=float(pending.get("timestamp") or time.time()),
+            timestamp=float(pending.get("timestamp") or self.storage.timestamp()),
         )
         # After emitting a click (even if delayed), refresh current screenshot so subsequent actions
         # see post-click UI changes quickly.
         self.current_updater.force_refresh()
 
+    def _dist_ok(self, px: float, py: float, qx: float, qy: float) -> bool:
+        """True if two click positions are close enough to form a double click."""
+        dx = px - qx
+        dy = py - qy
+        return dx * dx + dy * dy <= self._double_click_max_dist_sq
+
     def on_click(self, x, y, button, pressed):
         if not self.recording or self.paused: return
         if pressed:
@@ -417,10 +705,12 @@ class EventRecorder:
                 except Exception:
                     pass
 
-            now = time.time()
+            self._flush_pending_scroll()
+            mono_now = time.monotonic()
+            now = self.storage.timestamp(mono_now)
 
             # 1. Flush any pending typing
-            self.flush_typing()
+            self.flush_typing(now=now)
 
             # 2. Freeze latest pre-action screenshot
             screenshot = self._freeze_current_screenshot()
@@ -454,19 +744,14 @@ class EventRecorder:
                 self.current_updater.force_refresh()
                 return
 
-            def _dist_ok(px: float, py: float, qx: float, qy: float) -> bool:
-                dx = float(px) - float(qx)
-                dy = float(py) - float(qy)
-                return (dx * dx + dy * dy) ** 0.5 <= float(self._double_click_max_dist_px)
-
             flush_click: dict | None = None
             emit_double: dict | None = None
             with self._pending_click_lock:
                 pending = self._pending_click
                 if pending:
                     same_btn = str(pending.get("button_str") or "") == button_str
-                    dt_ok = (now - float(pending.get("timestamp") or 0.0)) <= float(self._double_click_max_interval_s)
-                    dist_ok = _dist_ok(
+                    dt_ok = (mono_now - float(pending.get("mono") or 0.0)) <= float(self._double_click_max_interval_s)
+                    dist_ok = self._dist_ok(
                         float(pending.get("x") or 0.0),
                         float(pending.get("y") or 0.0),
                         float(x),
@@ -500,6 +785,7 @@ class EventRecorder:
                         "y": float(y),
                         "screenshot": screenshot,
                         "timestamp": now,
+                        "mono": mono_now,
                     }
                     # Timer flushes the click as a normal click if no second click arrives.
                     t = threading.Timer(self._double_click_max_interval_s, self._flush_pending_click)
@@ -507,18 +793,20 @@ class EventRecorder:
                     self._pending_click_timer = t
                     t.start()
 
-            # Emit any flushed/combined events outside the lock.
-            if flush_click and self.recording and not self.paused:
+            # Emit any flushed/combined events outside the lock. Re-read the recording state once:
+            # it may have changed while we were freezing/buffering.
+            live = self.recording and not self.paused
+            if flush_click and live:
                 self._emit_click_like_event(
                     action_type="click",
                     button_str=str(flush_click.get("button_str") or ""),
                     x=float(flush_click.get("x") or 0.0),
                     y=float(flush_click.get("y") or 0.0),
                     screenshot=str(flush_click.get("screenshot") or ""),
-                    timestamp=float(flush_click.get("timestamp") or time.time()),
+                    timestamp=float(flush_click.get("timestamp") or self.storage.timestamp()),
                 )
                 self.current_updater.force_refresh()
-            if emit_double and self.recording and not self.paused:
+            if emit_double and live:
                 self._emit_click_like_event(
                     action_type="double_click",
                     button_str=str(emit_double.get("button_str") or button_str),
@@ -532,128 +820,179 @@ class EventRecorder:
     def on_scroll(self, x, y, dx, dy):
         if not self.recording or self.paused: return
         self._flush_pending_click()
-        now = time.time()
-        if now - self.last_scroll_time < self.scroll_throttle:
-            return
+        mono_now = time.monotonic()
+        with self._pending_scroll_lock:
+            pending = self._pending_scroll
+            if pending is not None:
+                pending["dx"] += dx
+                pending["dy"] += dy
+                pending["mono"] = mono_now
+                return
 
-        self.last_scroll_time = now
-        self.flush_typing()
+        # First tick of a burst: the screenshot must show the state before scrolling started.
+        now = self.storage.timestamp(mono_now)
+        self.flush_typing(now=now)
         screenshot = self._freeze_current_screenshot()
-
+        with self._pending_scroll_lock:
+            self._pending_scroll = {
+                "x": x,
+                "y": y,
+                "dx": dx,
+                "dy": dy,
+                "screenshot": screenshot,
+                "timestamp": now,
+                "mono": mono_now,
+            }
+            self._start_scroll_timer(self._scroll_quiet_s)
+
+    def _start_scroll_timer(self, delay_s: float) -> None:
+        """Arm the quiescence timer (caller holds _pending_scroll_lock)."""
+        t = threading.Timer(delay_s, self._on_scroll_timer)
+        t.daemon = True
+        self._scroll_timer = t
+        t.start()
+
+    def _on_scroll_timer(self) -> None:
+        # One timer per burst: if ticks arrived since it was armed, sleep for the rest of the quiet period.
+        with self._pending_scroll_lock:
+            pending = self._pending_scroll
+            if pending is None:
+                return
+            remaining = self._scroll_quiet_s - (time.monotonic() - pending["mono"])
+            if remaining > 0:
+                self._start_scroll_timer(remaining)
+                return
+        self._flush_pending_scroll()
+
+    def _flush_pending_scroll(self) -> None:
+        """Emit the buffered scroll burst (if any) as a single scroll event with accumulated dx/dy."""
+        with self._pending_scroll_lock:
+            pending = self._pending_scroll
+            self._pending_scroll = None
+            t = self._scroll_timer
+            self._scroll_timer = None
+        if t is not None:
+            t.cancel()
+        if not pending:
+            return
+        if not self.recording or self.paused:
+            return
         self._write_event({
             "action_type": "scroll",
-            "action_details": {"x": x, "y": y, "dx": dx, "dy": dy},
-            "screenshot": screenshot,
-            "timestamp": now
+            "action_details": {"x": pending["x"], "y": pending["y"], "dx": pending["dx"], "dy": pending["dy"]},
+            "screenshot": pending["screenshot"],
+            "timestamp": pending["timestamp"],
         })
         self.current_updater.force_refresh()
 
     def on_press(self, key):
         if not self.recording: return
-        if not self.paused:
-            self._flush_pending_click()
-
-        # Track Modifiers
-        if key in [keyboard.Key.cmd, keyboard.Key.cmd_l, keyboard.Key.cmd_r]:
-            self.modifiers.add("cmd")
-        if key in [keyboard.Key.ctrl, keyboard.Key.ctrl_l, keyboard.Key.ctrl_r]:
-            self.modifiers.add("ctrl")
-        if key in [keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r]:
-            self.modifiers.add("alt")
-        if key in [keyboard.Key.shift, keyboard.Key.shift_l, keyboard.Key.shift_r]:
-            self.modifiers.add("shift")
 
-        try:
-            char = key.char  # type: ignore[attr-defined]
-        except AttributeError:
-            char = None
+        # Track Modifiers (also while paused, so the state is right when recording resumes)
+        mod = _MOD_MASK.get(key)
+        if mod:
+            self.modifiers |= mod
 
         # # DEBUG: print every keypress + modifier state (helps debug Chrome vs Desktop).
-        # print(f"[KEY_DEBUG] on_press key={key!r} char={char!r} modifiers={sorted(self.modifiers)} paused={self.paused}")
-
+        # print(f"[KEY_DEBUG] on_press key={key!r} modifiers={self.modifiers:#06b} paused={self.paused}")
 
         # While paused: ignore everything (including typing bursts)
         if self.paused:
             return
+        self._flush_pending_click()
+        self._flush_pending_scroll()
 
-        # Special Keys: Flush typing, then record separately
-        # Note: on macOS laptops, F4 is often mapped to Launchpad.
-        # To record the raw F4 key, use Fn+F4 or check System Settings > Keyboard > Shortcuts.
-        if key in [keyboard.Key.enter, keyboard.Key.tab, keyboard.Key.esc, keyboard.Key.f4]:
-            self.flush_typing()
+        # One dict lookup for the action code, then an index into the handler tuple.
+        action = _KEY_ACTION.get(key, _ACT_CHAR)
+        if action == _ACT_SPACE:
+            action += self.modifiers & _MOD_CMD
+        self._key_handlers[action](key)
 
-            # Freeze latest pre-action screenshot (after flush_typing() which refreshes current to include typed text).
-            screenshot = self._freeze_current_screenshot()
+    def _on_char_key(self, key) -> None:
+        """Typed characters extend the typing burst; other keys without a handler are only logged."""
+        char = getattr(key, "char", None)
+        if char is None:
+            # Non-character keys (shift, ctrl, etc)
+            # Log unknown keys to help debug F4/Search issues (debug level: modifiers land here on every press)
+            logger.debug("Unknown/Special key pressed: %s", key)
+            return
 
-            key_name = str(key).replace("Key.", "").upper()
+        if char:
+            # Start of typing burst: capture pretyping frame once.
+            if not self.type_len:
+                self._capture_pretyping_screenshot()
 
-            self._write_event({
-                "action_type": "key",
-                "action_details": {"key": key_name},
-                "screenshot": screenshot,
-                "timestamp": time.time()
-            })
-            self.current_updater.force_refresh()
-            return
+            self._type_append(char)
 
-        # Handle Cmd+Space (Spotlight/Search) specifically
-        if key == keyboard.Key.space:
-             # Check if Cmd is currently held down.
-             # pynput Listener doesn't give us modifier state easily in on_press event args,
-             # but we can track it manually or use a helper.
-             # However, for now, let's just treat Cmd+Space as a special "Search" event if we can detect it.
-             # Since we don't have global state for modifiers in this simplified class yet,
-             # we will implement a basic modifier tracker.
-             pass
+    def _type_append(self, text: str) -> None:
+        """Append typed text to the burst buffer, growing it if needed."""
+        b = text.encode("utf-8", "surrogatepass")
+        start = self.type_len
+        end = start + len(b)
+        buf = self.type_buf
+        if end > len(buf):
+            buf.extend(bytes(max(end, 2 * len(buf)) - len(buf)))
+        buf[start:end] = b
+        self.type_len = end
 
-        if char is None:
-            # Handle Cmd+Space (Spotlight/Search)
-            if key == keyboard.Key.space and "cmd" in self.modifiers:
-                self.flush_typing()
-                screenshot = self._freeze_current_screenshot()
-                self._write_event({
-                    "action_type": "key",
-                    "action_details": {"key": "CMD+SPACE"}, # Explicitly log Search
-                    "screenshot": screenshot,
-                    "timestamp": time.time()
-                })
-                self.current_updater.force_refresh()
-                return
+    def _on_special_key(self, key) -> None:
+        """
+        Special Keys: Flush typing, then record separately.
+        Note: on macOS laptops, F4 is often mapped to Launchpad.
+        To record the raw F4 key, use Fn+F4 or check System Settings > Keyboard > Shortcuts.
+        """
+        # Timestamp the key press itself, not the end of a (possibly waiting) freeze.
+        now = self.storage.timestamp()
+        self.flush_typing(now=now)
 
-            # Treat space as normal typing if Cmd isn't held (pynput represents it as a Key, not a char)
-            if key == keyboard.Key.space and "cmd" not in self.modifiers:
-                if not self.type_buf:
-                    self._capture_pretyping_screenshot()
-                self.type_buf.append(" ")
-                return
+        # Freeze latest pre-action screenshot (recaptured first if stale).
+        screenshot = self._freeze_current_screenshot()
 
-            # Backspace: mutate the typing buffer (don’t emit a separate key event)
-            if key in [keyboard.Key.backspace, keyboard.Key.delete]:
-                if self.type_buf:
-                    self.type_buf.pop()
-                return
+        key_name = _KEY_NAMES.get(key) or str(key).replace("Key.", "").upper()
 
-            # Non-character keys (shift, ctrl, etc)
-            # Log unknown keys to help debug F4/Search issues
-            print(f"DEBUG: Unknown/Special key pressed: {key}")
-            return
+        self._write_event({
+            "action_type": "key",
+            "action_details": {"key": key_name},
+            "screenshot": screenshot,
+            "timestamp": now
+        })
+        self.current_updater.force_refresh()
 
-        if char:
-            # Start of typing burst: capture pretyping frame once.
-            if not self.type_buf:
-                self._capture_pretyping_screenshot()
+    def _on_cmd_space(self, key) -> None:
+        """Cmd+Space (Spotlight/Search); Cmd state comes from our own modifier tracker."""
+        now = self.storage.timestamp()
+        self.flush_typing(now=now)
+        screenshot = self._freeze_current_screenshot()
+        self._write_event({
+            "action_type": "key",
+            "action_details": {"key": "CMD+SPACE"}, # Explicitly log Search
+            "screenshot": screenshot,
+            "timestamp": now
+        })
+        self.current_updater.force_refresh()
+
+    def _on_space_key(self, key) -> None:
+        """Treat space as normal typing if Cmd isn't held (pynput represents it as a Key, not a char)."""
+        if not self.type_len:
+            self._capture_pretyping_screenshot()
+        self._type_append(" ")
 
-            self.type_buf.append(char)
+    def _on_erase_key(self, key) -> None:
+        """Backspace: drop the last typed character (don’t emit a separate key event)."""
+        n = self.type_len
+        if not n:
+            return
+        # Step back over UTF-8 continuation bytes (0b10xxxxxx) to the start of the last code point.
+        buf = self.type_buf
+        n -= 1
+        while n and (buf[n] & 0xC0) == 0x80:
+            n -= 1
+        self.type_len = n
 
     def on_release(self, key):
         # Update Modifiers
-        if key in [keyboard.Key.cmd, keyboard.Key.cmd_l, keyboard.Key.cmd_r]:
-            self.modifiers.discard("cmd")
-        if key in [keyboard.Key.ctrl, keyboard.Key.ctrl_l, keyboard.Key.ctrl_r]:
-            self.modifiers.discard("ctrl")
-        if key in [keyboard.Key.alt, keyboard.Key.alt_l, keyboard.Key.alt_r]:
-            self.modifiers.discard("alt")
-        if key in [keyboard.Key.shift, keyboard.Key.shift_l, keyboard.Key.shift_r]:
-            self.modifiers.discard("shift")
+        mod = _MOD_MASK.get(key)
+        if mod:
+            self.modifiers &= ~mod
 
         return
@@ -12,50 +12,88 @@ content *below* its window id (see ScreenshotRecorder.capture(exclude_window_id=
 # pyright: reportAttributeAccessIssue=false
 
 import time
+from contextlib import contextmanager
 from dataclasses import dataclass
+from functools import partial
 from typing import Any
 
 import AppKit  # type: ignore[import-not-found]
 
+# Module-level bindings for the AppKit names this module uses repeatedly: each AppKit.X access
+# goes through PyObjC's lazy module __getattr__.
+_NSMakeRect = AppKit.NSMakeRect
+_NSMakePoint = AppKit.NSMakePoint
+_NSStackView = AppKit.NSStackView
+_NSGridView = AppKit.NSGridView  # type: ignore[attr-defined]
+_NSAnimationContext = AppKit.NSAnimationContext
+_NSTimer = AppKit.NSTimer
+_Vertical = AppKit.NSUserInterfaceLayoutOrientationVertical  # type: ignore[attr-defined]
+_Leading = AppKit.NSLayoutAttributeLeading  # type: ignore[attr-defined]
+_OcclusionVisible = int(AppKit.NSWindowOcclusionStateVisible)  # type: ignore[attr-defined]
+_NSView = AppKit.NSView
+_NSButton = AppKit.NSButton
+_NSTextField = AppKit.NSTextField
+_NSImage = AppKit.NSImage
+_NSLayoutConstraint = AppKit.NSLayoutConstraint
+_NSOperationQueue = AppKit.NSOperationQueue
+_NSNotificationCenter = AppKit.NSNotificationCenter
+_Horizontal = AppKit.NSUserInterfaceLayoutOrientationHorizontal  # type: ignore[attr-defined]
+_CenterY = AppKit.NSLayoutAttributeCenterY  # type: ignore[attr-defined]
+_ImageLeft = AppKit.NSImageLeft  # type: ignore[attr-defined]
+
 from ai_mime.overlay.ui_common import (
     active_screen_visible_frame,
+    begin_user_activity,
+    end_user_activity,
     make_hud_effect_view,
     make_overlay_panel,
+    mouse_location,
+    screen_visible_frame_at,
     style_small_button,
     title_label,
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class RecordingOverlayState:
     mode: str = "collapsed"  # collapsed | details | extract
-    req_id: float | None = None
+    req_id: int | None = None
 
 
 class RecordingOverlayActionHandler(AppKit.NSObject):  # type: ignore[misc]
-    # ObjC selector methods; naming follows PyObjC conventions.
+    # ObjC selector methods; naming follows PyObjC conventions. The overlay binds the _*_fn
+    # callables at construction, so each selector is a single attribute load plus a call.
     def addDetails_(self, sender):  # noqa: N802
-        self._overlay._begin_refine("details")  # type: ignore[attr-defined]
+        self._add_details_fn()  # type: ignore[attr-defined]
 
     def extractData_(self, sender):  # noqa: N802
-        self._overlay._begin_refine("extract")  # type: ignore[attr-defined]
+        self._extract_data_fn()  # type: ignore[attr-defined]
 
     def cancelRecording_(self, sender):  # noqa: N802
-        self._overlay._cancel_recording()  # type: ignore[attr-defined]
+        self._cancel_recording_fn()  # type: ignore[attr-defined]
 
     def finishRecording_(self, sender):  # noqa: N802
-        self._overlay._finish_recording()  # type: ignore[attr-defined]
+        self._finish_recording_fn()  # type: ignore[attr-defined]
 
     def submit_(self, sender):  # noqa: N802
-        self._overlay._submit_form()  # type: ignore[attr-defined]
+        self._submit_fn()  # type: ignore[attr-defined]
 
     def cancel_(self, sender):  # noqa: N802
-        self._overlay._cancel_form()  # type: ignore[attr-defined]
+        self._cancel_fn()  # type: ignore[attr-defined]
+
+    def screenParametersChanged_(self, notification):  # noqa: N802
+        self._screens_changed_fn()  # type: ignore[attr-defined]
+
+    def screenResync_(self, generation):  # noqa: N802
+        self._screen_resync_fn(int(generation))  # type: ignore[attr-defined]
+
+    def occlusionChanged_(self, notification):  # noqa: N802
+        self._occlusion_fn()  # type: ignore[attr-defined]
 
     def sync_(self, sender):  # noqa: N802
         # Periodic reposition to active screen.
         try:
-            self._overlay._sync_position()  # type: ignore[attr-defined]
+            self._sync_fn()  # type: ignore[attr-defined]
         except Exception:
             pass
 
@@ -67,6 +105,9 @@ class RecordingOverlay:
       - Expanded: inline form + Submit/Cancel
     """
 
+    # SF Symbol images by name, shared across overlays (each lookup goes through Icon Services).
+    _SYMBOL_CACHE: dict[str, Any] = {}
+
     def __init__(
         self,
         *,
@@ -80,9 +121,56 @@ class RecordingOverlay:
         self._on_cancel_recording = on_cancel_recording
         self._on_finish_recording = on_finish_recording
         self._state = RecordingOverlayState()
+        # Refine request ids; queues are per recording, so a per-overlay counter is unique enough.
+        self._req_counter = 0
         self._action_handler = RecordingOverlayActionHandler.alloc().init()
-        self._action_handler._overlay = self  # type: ignore[attr-defined]
+        h = self._action_handler
+        h._add_details_fn = partial(self._begin_refine, "details")  # type: ignore[attr-defined]
+        h._extract_data_fn = partial(self._begin_refine, "extract")  # type: ignore[attr-defined]
+        h._cancel_recording_fn = self._cancel_recording  # type: ignore[attr-defined]
+        h._finish_recording_fn = self._finish_recording  # type: ignore[attr-defined]
+        h._submit_fn = self._submit_form  # type: ignore[attr-defined]
+        h._cancel_fn = self._cancel_form  # type: ignore[attr-defined]
+        h._screens_changed_fn = self._on_screens_changed  # type: ignore[attr-defined]
+        h._screen_resync_fn = self._screen_resync  # type: ignore[attr-defined]
+        h._occlusion_fn = self._update_sync_for_occlusion  # type: ignore[attr-defined]
+        h._sync_fn = self._sync_if_visible  # type: ignore[attr-defined]
         self._sync_timer = None
+        self._sync_timer_interval = 0.0
+        # True while the timer is stopped because the panel is fully occluded (e.g. screen locked).
+        self._sync_paused = False
+        # App Nap opt-out held while shown, so the sync timer isn't throttled in the background.
+        self._activity: Any = None
+        # Tick fast right after showing / a mode change / cursor motion, slowly once idle.
+        self._sync_fast_s = 0.5
+        self._sync_idle_s = 3.0
+        self._sync_idle_after_s = 5.0
+        # Timer tolerance as a fraction of the interval (250ms at the fast cadence).
+        self._sync_leeway_ratio = 0.5
+        self._last_motion_ts = time.monotonic()
+        self._last_mouse: tuple[float, float] | None = None
+        # Last applied panel frame, and recent screen lookups keyed by quantized mouse position
+        # (small LRU, oldest first; cleared when the display configuration changes, and entries
+        # expire after a TTL in case a change arrives without a notification).
+        self._last_frame: tuple[float, float, float, float] | None = None
+        self._screen_frames: dict[tuple[int, int], tuple[tuple[float, float, float, float], float]] = {}
+        self._screen_cache_size = 4
+        self._screen_cache_ttl_s = 10.0
+        # NSRects for panel frames already used (one per mode size per screen), reused on resize.
+        self._rect_cache: dict[tuple[float, float, float, float], Any] = {}
+        # Display changes and occlusion resumes reposition once, 500ms after the last event in a
+        # burst (menu bar / Dock frames are still animating right after the notification).
+        self._screen_change_gen = 0
+        self._screen_resync_delay_s = 0.5
+        try:
+            _NSNotificationCenter.defaultCenter().addObserver_selector_name_object_(
+                self._action_handler,
+                "screenParametersChanged:",
+                AppKit.NSApplicationDidChangeScreenParametersNotification,  # type: ignore[attr-defined]
+                None,
+            )
+        except Exception:
+            pass
 
         # Window sizing / placement
         # Width is dynamic: collapsed is compact; expanded grows up to a max.
@@ -98,7 +186,7 @@ class RecordingOverlay:
         sx, sy, sw, sh = active_screen_visible_frame()
         x = float(sx + sw - self._collapsed_width - self._margin)
         y = float(sy + (sh - self._height_collapsed) / 2.0)
-        rect = AppKit.NSMakeRect(x, y, self._collapsed_width, self._height_collapsed)
+        rect = _NSMakeRect(x, y, self._collapsed_width, self._height_collapsed)
 
         # Recording overlay needs to be able to become key so text inputs are editable,
         # but we keep non-activating panel style for better fullscreen Spaces behavior.
@@ -106,62 +194,90 @@ class RecordingOverlay:
         # Create content at max width; it will autoresize with the panel frame.
         self._content = make_hud_effect_view(self._max_width, self._height_extract)
         self._panel.setContentView_(self._content)
-
-        # Main stack (we rebuild contents per mode for simplicity)
-        self._stack = AppKit.NSStackView.alloc().initWithFrame_(AppKit.NSMakeRect(0, 0, self._collapsed_width, self._height_collapsed))
-        self._stack.setOrientation_(AppKit.NSUserInterfaceLayoutOrientationVertical)  # type: ignore[attr-defined]
-        self._stack.setAlignment_(AppKit.NSLayoutAttributeLeading)  # type: ignore[attr-defined]
-        self._stack.setSpacing_(6.0)
         try:
-            insets = AppKit.NSMakeEdgeInsets(0, 0, 0, 0)  # type: ignore[attr-defined]
-            self._stack.setEdgeInsets_(insets)
-        except Exception:
-            pass
-
-        self._content.addSubview_(self._stack)
-        try:
-            m = 6.0
-            self._stack.setTranslatesAutoresizingMaskIntoConstraints_(False)
-            AppKit.NSLayoutConstraint.activateConstraints_(
-                [
-                    self._stack.leadingAnchor().constraintEqualToAnchor_constant_(self._content.leadingAnchor(), m),
-                    self._stack.trailingAnchor().constraintEqualToAnchor_constant_(self._content.trailingAnchor(), -m),
-                    self._stack.topAnchor().constraintEqualToAnchor_constant_(self._content.topAnchor(), m),
-                    self._stack.bottomAnchor().constraintEqualToAnchor_constant_(self._content.bottomAnchor(), -m),
-                ]
+            center = _NSNotificationCenter.defaultCenter()
+            center.addObserver_selector_name_object_(
+                self._action_handler,
+                "occlusionChanged:",
+                AppKit.NSWindowDidChangeOcclusionStateNotification,  # type: ignore[attr-defined]
+                self._panel,
+            )
+            center.addObserver_selector_name_object_(
+                self._action_handler,
+                "occlusionChanged:",
+                AppKit.NSApplicationDidBecomeActiveNotification,  # type: ignore[attr-defined]
+                None,
+            )
+            center.addObserver_selector_name_object_(
+                self._action_handler,
+                "screenParametersChanged:",
+                AppKit.NSWindowDidChangeScreenNotification,  # type: ignore[attr-defined]
+                self._panel,
             )
         except Exception:
             pass
 
-        # Inputs (created once; inserted/removed based on mode)
-        self._details_field = AppKit.NSTextField.alloc().initWithFrame_(AppKit.NSMakeRect(0, 0, 240, 24))
-        self._details_field.setPlaceholderString_("Details (natural language)")
-        try:
-            self._details_field.setEditable_(True)
-            self._details_field.setSelectable_(True)
-            self._details_field.setBezeled_(True)
-        except Exception:
-            pass
-
-        self._query_field = AppKit.NSTextField.alloc().initWithFrame_(AppKit.NSMakeRect(0, 0, 240, 24))
-        self._query_field.setPlaceholderString_("Query (what to extract from the page)")
+        # Main stack: holds one prebuilt container per mode; only the active one is visible.
+        self._stack = _NSStackView.alloc().initWithFrame_(_NSMakeRect(0, 0, self._collapsed_width, self._height_collapsed))
+        self._stack.setOrientation_(_Vertical)
+        self._stack.setAlignment_(_Leading)
+        self._stack.setSpacing_(6.0)
         try:
-            self._query_field.setEditable_(True)
-            self._query_field.setSelectable_(True)
-            self._query_field.setBezeled_(True)
+            insets = AppKit.NSMakeEdgeInsets(0, 0, 0, 0)  # type: ignore[attr-defined]
+            self._stack.setEdgeInsets_(insets)
         except Exception:
             pass
 
-        self._values_field = AppKit.NSTextField.alloc().initWithFrame_(AppKit.NSMakeRect(0, 0, 240, 24))
-        self._values_field.setPlaceholderString_("Values (what you extracted)")
-        try:
-            self._values_field.setEditable_(True)
-            self._values_field.setSelectable_(True)
-            self._values_field.setBezeled_(True)
-        except Exception:
-            pass
+        self._content.addSubview_(self._stack)
+        # Pin the stack to the content view with a 6pt inset; activated together in one call.
+        # Both views were just created here, so a failure is a real bug and should surface.
+        m = 6.0
+        stack, content = self._stack, self._content
+        stack.setTranslatesAutoresizingMaskIntoConstraints_(False)
+        _NSLayoutConstraint.activateConstraints_(
+            [
+                stack.leadingAnchor().constraintEqualToAnchor_constant_(content.leadingAnchor(), m),
+                stack.trailingAnchor().constraintEqualToAnchor_constant_(content.trailingAnchor(), -m),
+                stack.topAnchor().constraintEqualToAnchor_constant_(content.topAnchor(), m),
+                stack.bottomAnchor().constraintEqualToAnchor_constant_(content.bottomAnchor(), -m),
+            ]
+        )
+
+        # Inputs (created once; shown/hidden with their mode's container)
+        self._details_field = self._text_input("Details (natural language)")
+        self._query_field = self._text_input("Query (what to extract from the page)")
+        self._values_field = self._text_input("Values (what you extracted)")
+
+        # Build every mode's views once; switching modes only toggles their hidden flags.
+        self._collapsed_view = self._build_collapsed_view()
+        self._details_view = self._vstack(
+            [self._title_label("Add more details"), self._details_field, self._submit_cancel_row()]
+        )
+        self._extract_view = self._vstack(
+            [self._title_label("Extract Data"), self._query_field, self._values_field, self._submit_cancel_row()]
+        )
+        mode_views = [self._collapsed_view, self._details_view, self._extract_view]
+        for v in mode_views:
+            v.setHidden_(True)
+        # Install all three in one call (one layout invalidation instead of one per add).
+        self._stack.setViews_inGravity_(mode_views, AppKit.NSStackViewGravityTop)  # type: ignore[attr-defined]
+        # mode -> (container, width, height, first responder)
+        self._mode_layouts: dict[str, tuple[Any, float, float, Any]] = {
+            "collapsed": (self._collapsed_view, self._collapsed_width, self._height_collapsed, None),
+            "details": (self._details_view, self._max_width, self._height_details, self._details_field),
+            "extract": (self._extract_view, self._max_width, self._height_extract, self._query_field),
+        }
+        # mode -> builder for the refine response sent on Submit (other modes submit a cancel)
+        self._form_builders: dict[str, Any] = {
+            "details": self._details_response,
+            "extract": self._extract_response,
+        }
+        # Layout is applied on the next main-queue turn, so back-to-back mode changes lay out once.
+        self._rendered_mode: str | None = None
+        self._render_scheduled = False
 
         self._render_collapsed()
+        self._flush_render()
         self.hide()
 
     def window_id(self) -> int:
@@ -172,17 +288,11 @@ class RecordingOverlay:
 
     def show(self) -> None:
         # Keep pinned to the active screen while visible.
+        self._last_motion_ts = time.monotonic()
         if self._sync_timer is None:
-            try:
-                self._sync_timer = AppKit.NSTimer.scheduledTimerWithTimeInterval_target_selector_userInfo_repeats_(
-                    0.5,
-                    self._action_handler,
-                    "sync:",
-                    None,
-                    True,
-                )
-            except Exception:
-                self._sync_timer = None
+            self._start_sync_timer(self._sync_fast_s)
+        if self._activity is None:
+            self._activity = begin_user_activity("Recording session")
         self._sync_position()
         try:
             self._panel.orderFrontRegardless()
@@ -193,28 +303,88 @@ class RecordingOverlay:
                 pass
 
     def hide(self) -> None:
-        if self._sync_timer is not None:
-            try:
-                self._sync_timer.invalidate()
-            except Exception:
-                pass
-            self._sync_timer = None
+        self._sync_paused = False
+        self._stop_sync_timer()
+        self._end_activity()
         try:
             self._panel.orderOut_(None)
         except Exception:
             pass
 
     def close(self) -> None:
+        self._sync_paused = False
+        self._stop_sync_timer()
+        self._end_activity()
+        try:
+            _NSNotificationCenter.defaultCenter().removeObserver_(self._action_handler)
+        except Exception:
+            pass
+        try:
+            self._panel.close()
+        except Exception:
+            pass
+
+    def _end_activity(self) -> None:
+        token, self._activity = self._activity, None
+        end_user_activity(token)
+
+    @property
+    def _sync_interval(self) -> float:
+        """Slow cadence only while collapsed and the cursor has been still for a while."""
+        if self._state.mode == "collapsed" and time.monotonic() - self._last_motion_ts > self._sync_idle_after_s:
+            return self._sync_idle_s
+        return self._sync_fast_s
+
+    def _start_sync_timer(self, interval: float) -> None:
+        try:
+            self._sync_timer = _NSTimer.scheduledTimerWithTimeInterval_target_selector_userInfo_repeats_(
+                interval,
+                self._action_handler,
+                "sync:",
+                None,
+                True,
+            )
+            # Let the OS coalesce this wakeup with others; placement doesn't need to be punctual.
+            self._sync_timer.setTolerance_(interval * self._sync_leeway_ratio)
+            self._sync_timer_interval = interval
+        except Exception:
+            self._sync_timer = None
+
+    def _stop_sync_timer(self) -> None:
         if self._sync_timer is not None:
             try:
                 self._sync_timer.invalidate()
             except Exception:
                 pass
             self._sync_timer = None
+
+    def _retune_sync_timer(self) -> None:
+        """Re-arm the sync timer if the wanted cadence changed (NSTimer intervals are fixed)."""
+        if self._sync_timer is None:
+            return
+        interval = self._sync_interval
+        if interval != self._sync_timer_interval:
+            self._stop_sync_timer()
+            self._start_sync_timer(interval)
+
+    def _update_sync_for_occlusion(self) -> None:
+        """
+        Stop the sync timer while no part of the panel is visible and restart it when it is again.
+        Only a timer started by show() is paused/resumed; a hidden overlay stays idle.
+        """
         try:
-            self._panel.close()
+            visible = bool(int(self._panel.occlusionState()) & _OcclusionVisible)
         except Exception:
-            pass
+            return
+        if not visible and self._sync_timer is not None:
+            self._stop_sync_timer()
+            self._sync_paused = True
+        elif visible and self._sync_paused:
+            self._sync_paused = False
+            self._last_motion_ts = time.monotonic()
+            self._start_sync_timer(self._sync_fast_s)
+            # Spaces switches toggle occlusion several times in a row; reposition once they settle.
+            self._schedule_resync()
 
     def _sync_position(self) -> None:
         """
@@ -226,35 +396,136 @@ class RecordingOverlay:
             self._place_on_active_screen(float(w), float(h))
         except Exception:
             pass
+        self._retune_sync_timer()
+
+    def _sync_if_visible(self) -> None:
+        """
+        Timer/resync entry point: skip all placement work if the panel was ordered out meanwhile
+        (a tick or delayed resync can still fire once after hide()). show() places unconditionally,
+        since it positions the panel before ordering it front.
+        """
+        try:
+            if not self._panel.isVisible():
+                return
+        except Exception:
+            return
+        self._sync_position()
+
+    def _active_screen_frame(self) -> tuple[float, float, float, float]:
+        """
+        Visible frame of the screen under the mouse, reusing recent lookups for the same 8pt cell
+        (skips the NSScreen.screens() walk on steady ticks and when moving between a few spots).
+        """
+        try:
+            mx, my = mouse_location()
+        except Exception:
+            return active_screen_visible_frame()
+        last = self._last_mouse
+        if last is None or abs(mx - last[0]) >= 1.0 or abs(my - last[1]) >= 1.0:
+            self._last_mouse = (mx, my)
+            self._last_motion_ts = time.monotonic()
+        key = (int(mx) >> 3, int(my) >> 3)
+        cache = self._screen_frames
+        now = time.monotonic()
+        entry = cache.pop(key, None)
+        if entry is None or now - entry[1] > self._screen_cache_ttl_s:
+            entry = (screen_visible_frame_at(mx, my), now)
+            if len(cache) >= self._screen_cache_size:
+                del cache[next(iter(cache))]
+        cache[key] = entry
+        return entry[0]
+
+    def _invalidate_screen_cache(self) -> None:
+        # Screens were added/removed/rearranged or the Dock/menu bar changed visible frames.
+        self._screen_frames.clear()
+        self._rect_cache.clear()
+
+    def _on_screens_changed(self) -> None:
+        """Drop cached screen frames now and reposition once the burst of changes settles."""
+        self._invalidate_screen_cache()
+        self._schedule_resync()
+
+    def _schedule_resync(self) -> None:
+        """Reposition after a short delay; a newer request in the meantime supersedes this one."""
+        self._screen_change_gen += 1
+        try:
+            self._action_handler.performSelector_withObject_afterDelay_(
+                "screenResync:", self._screen_change_gen, self._screen_resync_delay_s
+            )
+        except Exception:
+            pass
+
+    def _screen_resync(self, generation: int) -> None:
+        # Only the latest change in a burst repositions; a hidden/paused overlay waits for show().
+        if generation != self._screen_change_gen or self._sync_timer is None:
+            return
+        self._invalidate_screen_cache()
+        self._last_motion_ts = time.monotonic()
+        self._sync_if_visible()
 
     def _place_on_active_screen(self, w: float, h: float) -> None:
         try:
-            sx, sy, sw, sh = active_screen_visible_frame()
+            sx, sy, sw, sh = self._active_screen_frame()
         except Exception:
             sx, sy, sw, sh = 0.0, 0.0, 1440.0, 900.0
         x = float(sx + sw - float(w) - self._margin)
         y = float(sy + (sh - float(h)) / 2.0)
+        frame = (x, y, float(w), float(h))
+        last = self._last_frame
+        if last is not None and all(abs(a - b) < 0.5 for a, b in zip(frame, last)):
+            return
         try:
-            self._panel.setFrame_display_(AppKit.NSMakeRect(x, y, float(w), float(h)), True)
+            if last is not None and abs(frame[2] - last[2]) < 0.5 and abs(frame[3] - last[3]) < 0.5:
+                self._reposition(x, y)
+            else:
+                self._resize(frame)
+            self._last_frame = frame
         except Exception:
             pass
 
-    def _clear_stack(self) -> None:
+    def _reposition(self, x: float, y: float) -> None:
+        # Same size (e.g. cursor moved to another screen): a pure move, no redisplay or size/constraint resolution.
+        self._panel.setFrameOrigin_(_NSMakePoint(x, y))
+
+    def _resize(self, frame: tuple[float, float, float, float]) -> None:
+        # Size changes come with a mode switch, so the content does need redrawing; hold window
+        # flushes so the resize and that redraw reach the window server as one update.
+        rect = self._rect_cache.get(frame)
+        if rect is None:
+            if len(self._rect_cache) >= 16:
+                self._rect_cache.clear()
+            rect = self._rect_cache[frame] = _NSMakeRect(*frame)
+        self._panel.disableFlushWindow()
         try:
-            arranged = list(self._stack.arrangedSubviews())
-        except Exception:
-            arranged = []
-        for v in arranged:
-            try:
-                self._stack.removeArrangedSubview_(v)
-            except Exception:
-                pass
-            try:
-                v.removeFromSuperview()
-            except Exception:
-                pass
+            self._panel.setFrame_display_(rect, True)
+        finally:
+            self._panel.enableFlushWindow()
+
+    @contextmanager
+    def _layout_batch(self):
+        """
+        Group a mode switch's view mutations into one non-animated NSAnimationContext, so the
+        resize and subview changes commit together and lay out once instead of per call.
+        """
+        _NSAnimationContext.beginGrouping()
+        try:
+            ctx = _NSAnimationContext.currentContext()
+            ctx.setDuration_(0.0)
+            ctx.setAllowsImplicitAnimation_(False)
+            yield
+        finally:
+            _NSAnimationContext.endGrouping()
+            self._content.setNeedsLayout_(True)
+
+    def _show_mode_view(self, view: Any) -> None:
+        # NSStackView detaches hidden arranged views, so the inactive containers take no space.
+        for v in (self._collapsed_view, self._details_view, self._extract_view):
+            v.setHidden_(v is not view)
 
     def _set_size(self, w: float, h: float) -> None:
+        # Every mode change resizes through here; track the next few seconds closely.
+        self._last_motion_ts = time.monotonic()
+        self._retune_sync_timer()
         try:
             # Keep it pinned to the active screen right edge and vertically centered.
             self._place_on_active_screen(float(w), float(h))
@@ -265,36 +536,48 @@ class RecordingOverlay:
         return title_label(text)
 
     def _button(self, title: str, action: str) -> Any:
-        b = AppKit.NSButton.buttonWithTitle_target_action_(title, self._action_handler, action)  # type: ignore[attr-defined]
+        b = _NSButton.buttonWithTitle_target_action_(title, self._action_handler, action)  # type: ignore[attr-defined]
         return style_small_button(b)
 
     def _icon_button(self, title: str, action: str, symbol_name: str) -> Any:
         b = self._button(title, action)
         try:
-            img = AppKit.NSImage.imageWithSystemSymbolName_accessibilityDescription_(symbol_name, None)  # type: ignore[attr-defined]
+            img = self._SYMBOL_CACHE.get(symbol_name)
+            if img is None:
+                img = _NSImage.imageWithSystemSymbolName_accessibilityDescription_(symbol_name, None)  # type: ignore[attr-defined]
+                if img is not None:
+                    self._SYMBOL_CACHE[symbol_name] = img
             if img is not None:
                 b.setImage_(img)
-                b.setImagePosition_(AppKit.NSImageLeft)  # type: ignore[attr-defined]
+                b.setImagePosition_(_ImageLeft)
         except Exception:
             pass
         return b
 
-    def _render_collapsed(self) -> None:
-        self._state.mode = "collapsed"
-        self._state.req_id = None
-        self._clear_stack()
-
-        self._set_size(self._collapsed_width, self._height_collapsed)
-
-        self._stack.addArrangedSubview_(self._title_label("Recording"))
-
+    def _text_input(self, placeholder: str) -> Any:
+        # Plain NSTextField setters; these exist on every supported macOS, so no guards needed.
+        field = _NSTextField.alloc().initWithFrame_(_NSMakeRect(0, 0, 240, 24))
+        field.setPlaceholderString_(placeholder)
+        field.setEditable_(True)
+        field.setSelectable_(True)
+        field.setBezeled_(True)
+        return field
+
+    def _vstack(self, views: list[Any]) -> Any:
+        stack = _NSStackView.stackViewWithViews_(views)  # type: ignore[attr-defined]
+        stack.setOrientation_(_Vertical)
+        stack.setAlignment_(_Leading)
+        stack.setSpacing_(6.0)
+        return stack
+
+    def _build_collapsed_view(self) -> Any:
         # Tight 2x2 grid of icon buttons.
         b_details = self._icon_button("Add more details", "addDetails:", "square.and.pencil")
         b_extract = self._icon_button("Extract Data", "extractData:", "doc.text.magnifyingglass")
         b_finish = self._icon_button("Finish Recording", "finishRecording:", "checkmark.circle")
         b_cancel = self._icon_button("Cancel recording", "cancelRecording:", "xmark.circle")
 
-        grid = AppKit.NSGridView.gridViewWithViews_([[b_details, b_extract], [b_finish, b_cancel]])  # type: ignore[attr-defined]
+        grid = _NSGridView.gridViewWithViews_([[b_details, b_extract], [b_finish, b_cancel]])  # type: ignore[attr-defined]
         try:
             grid.setRowSpacing_(6.0)
             grid.setColumnSpacing_(6.0)
@@ -309,15 +592,46 @@ class RecordingOverlay:
                 cols[1].setWidth_(w)
         except Exception:
             pass
-        self._stack.addArrangedSubview_(grid)
+        return self._vstack([self._title_label("Recording"), grid])
+
+    def _request_render(self) -> None:
+        if self._render_scheduled:
+            return
+        self._render_scheduled = True
+        _NSOperationQueue.mainQueue().addOperationWithBlock_(self._flush_render)
+
+    def _flush_render(self) -> None:
+        """Lay out whatever mode the state ended up in; intermediate modes are never drawn."""
+        self._render_scheduled = False
+        mode = self._state.mode
+        if mode == self._rendered_mode:
+            return
+        self._rendered_mode = mode
+        view, w, h, responder = self._mode_layouts[mode]
+        with self._layout_batch():
+            self._show_mode_view(view)
+            self._set_size(w, h)
+        if responder is not None:
+            try:
+                self._panel.makeFirstResponder_(responder)
+            except Exception:
+                pass
+
+    def _render_collapsed(self) -> None:
+        self._state.mode = "collapsed"
+        self._state.req_id = None
+        self._request_render()
 
     def _begin_refine(self, kind: str) -> None:
         if self._state.mode != "collapsed":
             return
 
-        req_id = float(time.time())
+        self._req_counter += 1
+        req_id = self._req_counter
         self._state.req_id = req_id
         try:
+            # Safe on the main thread: the refine queues are unbounded multiprocessing.Queues, whose
+            # put() only appends to a buffer; pickling and the pipe write happen on the feeder thread.
             self._cmd_q.put({"type": "begin_refine", "kind": str(kind), "req_id": req_id})
         except Exception:
             # If we can't talk to recorder, just stay collapsed.
@@ -329,53 +643,35 @@ class RecordingOverlay:
         else:
             self._render_extract(req_id)
 
-        # Make the panel key so the text field can accept input.
+        # Make the panel key so the text field can accept input (skip round trips that are no-ops).
         try:
-            AppKit.NSApplication.sharedApplication().activateIgnoringOtherApps_(True)
-            self._panel.makeKeyAndOrderFront_(None)
+            app = AppKit.NSApplication.sharedApplication()
+            if not app.isActive():
+                app.activateIgnoringOtherApps_(True)
+            if not self._panel.isKeyWindow():
+                self._panel.makeKeyAndOrderFront_(None)
         except Exception:
             pass
 
-    def _render_details(self, req_id: float) -> None:
+    def _render_details(self, req_id: int) -> None:
         self._state.mode = "details"
-        self._clear_stack()
-        self._set_size(self._max_width, self._height_details)
-
-        self._stack.addArrangedSubview_(self._title_label("Add more details"))
         self._details_field.setStringValue_("")
-        self._stack.addArrangedSubview_(self._details_field)
-        self._stack.addArrangedSubview_(self._submit_cancel_row())
-
-        try:
-            self._panel.makeFirstResponder_(self._details_field)
-        except Exception:
-            pass
+        self._request_render()
 
-    def _render_extract(self, req_id: float) -> None:
+    def _render_extract(self, req_id: int) -> None:
         self._state.mode = "extract"
-        self._clear_stack()
-        self._set_size(self._max_width, self._height_extract)
-
-        self._stack.addArrangedSubview_(self._title_label("Extract Data"))
         self._query_field.setStringValue_("")
         self._values_field.setStringValue_("")
-        self._stack.addArrangedSubview_(self._query_field)
-        self._stack.addArrangedSubview_(self._values_field)
-        self._stack.addArrangedSubview_(self._submit_cancel_row())
-
-        try:
-            self._panel.makeFirstResponder_(self._query_field)
-        except Exception:
-            pass
+        self._request_render()
 
     def _submit_cancel_row(self) -> Any:
-        row = AppKit.NSStackView.alloc().initWithFrame_(AppKit.NSMakeRect(0, 0, self._max_width, 28))
-        row.setOrientation_(AppKit.NSUserInterfaceLayoutOrientationHorizontal)  # type: ignore[attr-defined]
-        row.setAlignment_(AppKit.NSLayoutAttributeCenterY)  # type: ignore[attr-defined]
+        row = _NSStackView.alloc().initWithFrame_(_NSMakeRect(0, 0, self._max_width, 28))
+        row.setOrientation_(_Horizontal)
+        row.setAlignment_(_CenterY)
         row.setSpacing_(10.0)
 
         # Spacer to push buttons right.
-        spacer = AppKit.NSView.alloc().initWithFrame_(AppKit.NSMakeRect(0, 0, 1, 1))
+        spacer = _NSView.alloc().initWithFrame_(_NSMakeRect(0, 0, 1, 1))
         row.addArrangedSubview_(spacer)
         try:
             spacer.setContentHuggingPriority_forOrientation_(1, AppKit.NSLayoutConstraintOrientationHorizontal)  # type: ignore[attr-defined]
@@ -392,15 +688,8 @@ class RecordingOverlay:
             self._render_collapsed()
             return
 
-        if self._state.mode == "details":
-            text = str(self._details_field.stringValue() or "").strip()
-            resp = {"kind": "details", "text": text, "req_id": req_id}
-        elif self._state.mode == "extract":
-            query = str(self._query_field.stringValue() or "").strip()
-            values = str(self._values_field.stringValue() or "").strip()
-            resp = {"kind": "extract", "query": query, "values": values, "req_id": req_id}
-        else:
-            resp = {"kind": "cancel", "req_id": req_id}
+        builder = self._form_builders.get(self._state.mode)
+        resp = builder(req_id) if builder is not None else {"kind": "cancel", "req_id": req_id}
 
         try:
             self._resp_q.put(resp)
@@ -408,6 +697,15 @@ class RecordingOverlay:
             pass
         self._render_collapsed()
 
+    def _details_response(self, req_id: int) -> dict[str, Any]:
+        text = str(self._details_field.stringValue() or "").strip()
+        return {"kind": "details", "text": text, "req_id": req_id}
+
+    def _extract_response(self, req_id: int) -> dict[str, Any]:
+        query = str(self._query_field.stringValue() or "").strip()
+        values = str(self._values_field.stringValue() or "").strip()
+        return {"kind": "extract", "query": query, "values": values, "req_id": req_id}
+
     def _cancel_form(self) -> None:
         req_id = self._state.req_id
         if req_id is not None:
@@ -1,12 +1,8 @@
-import time
-import multiprocessing
-import os
 import sys
-import traceback
-from pathlib import Path
 from .storage import SessionStorage
 from .capture import EventRecorder
 from ..app_data import get_recordings_dir
+from ..overlay.ui_common import begin_user_activity, end_user_activity
 from ..debug_log import log
 
 def run_recorder_process(
@@ -26,8 +22,6 @@ def run_recorder_process(
     log(f"base_dir={base_dir}")
     log(f"sys.frozen={getattr(sys, 'frozen', False)}")
 
-    print(f"Recorder process started for session: {name}")
-
     # Initialize storage and recorder in this process
     resolved_base = base_dir or str(get_recordings_dir())
     log(f"Resolved base_dir: {resolved_base}")
@@ -38,9 +32,7 @@ def run_recorder_process(
         storage.start_session(name, description=description)
         log(f"Session started: {storage.session_dir}")
     except Exception as e:
-        log(f"FAILED start_session: {e}")
-        log(traceback.format_exc())
-        print(f"Failed to start session: {e}")
+        log(f"FAILED start_session: {e}", exc_info=True)
         return
 
     # Let the UI process know where the session is being written.
@@ -50,6 +42,8 @@ def run_recorder_process(
     except Exception:
         pass
 
+    # Keep App Nap from throttling the listener/screenshot threads while the app is backgrounded.
+    activity = begin_user_activity("Recording session")
     try:
         log("Creating EventRecorder...")
         recorder = EventRecorder(
@@ -63,21 +57,17 @@ def run_recorder_process(
         # The EventRecorder.start() method needs to be "clean" again for this usage.
         # We will need to restore the synchronous start since we are now in our own process.
 
-        print("Starting recorder engine...")
         log("Starting recorder listeners...")
         recorder.start()
         log("Recorder started successfully")
 
-        # Wait for stop signal
-        while not stop_event.is_set():
-            time.sleep(0.1)
+        # Wait for stop signal (blocks on the event's semaphore; no polling wakeups).
+        stop_event.wait()
 
-        print("Stopping recorder engine...")
         log("Stopping recorder...")
         recorder.stop()
         log("Recorder stopped successfully")
-
-        print("Recorder process finished.")
     except Exception as e:
-        log(f"FATAL recorder error: {e}")
-        log(traceback.format_exc())
+        log(f"FATAL recorder error: {e}", exc_info=True)
+    finally:
+        end_user_activity(activity)
@@ -1,9 +1,28 @@
 import os
+import re
 import json
 import time
-import shutil
 from pathlib import Path
 
+try:
+    import orjson as _orjson
+except ImportError:  # optional speedup; the stdlib encoder produces the same manifest lines
+    _orjson = None
+
+# Characters dropped from session names: \w is Unicode-aware, matching str.isalnum() plus "_".
+_UNSAFE_NAME_CHARS = re.compile(r"[^\w \-]")
+
+def _dumps_line(event_data):
+    """Serialize one manifest event to compact UTF-8 JSON bytes (no trailing newline)."""
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(event_data)
+        except TypeError:
+            # orjson is stricter (e.g. non-str keys, >64-bit ints); let json decide.
+            pass
+    return json.dumps(event_data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
 class SessionStorage:
     def __init__(self, base_dir="recordings"):
         self.base_dir = Path(base_dir)
@@ -12,13 +31,27 @@ class SessionStorage:
         self.audio_dir = None
         self.manifest_path = None
         self.metadata_path = None
+        # Session clock anchor: event timestamps are wall time at session start plus monotonic
+        # elapsed time, so they never jump with NTP/clock changes mid-recording.
+        self._clock_wall0 = None
+        self._clock_mono0 = None
+        # Manifest opened once per session in append mode; closed (and fsynced) by close_session().
+        self._manifest_fh = None
         self.screenshot_counter = 0
         self.audio_counter = 0
+        # String forms of the session dirs (absolute and manifest-relative), set per session, so
+        # per-screenshot paths are plain string joins instead of Path objects.
+        self._session_dir_prefix = None
+        self._screenshots_dir_str = None
+        self._screenshots_rel = None
+        self._audio_dir_str = None
 
     def start_session(self, name, description="", config=None):
         """Initialize a new session directory and metadata."""
         timestamp = time.strftime("%Y%m%dT%H%M%SZ")
-        safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).strip().replace(' ', '_')
+        self._clock_wall0 = time.time()
+        self._clock_mono0 = time.monotonic()
+        safe_name = _UNSAFE_NAME_CHARS.sub("", name).strip().replace(" ", "_")
         session_folder_name = f"{timestamp}-{safe_name}"
 
         self.session_dir = self.base_dir / session_folder_name
@@ -26,10 +59,14 @@ class SessionStorage:
         self.audio_dir = self.session_dir / "audio"
         self.manifest_path = self.session_dir / "manifest.jsonl"
         self.metadata_path = self.session_dir / "metadata.json"
+        self._session_dir_prefix = os.path.join(str(self.session_dir), "")
+        self._screenshots_dir_str = str(self.screenshots_dir)
+        self._screenshots_rel = os.path.relpath(self.screenshots_dir, self.session_dir)
+        self._audio_dir_str = str(self.audio_dir)
 
-        # Create directories
+        # Create directories (the first call creates the session dir; audio/ only needs itself).
         self.screenshots_dir.mkdir(parents=True, exist_ok=True)
-        self.audio_dir.mkdir(parents=True, exist_ok=True)
+        self.audio_dir.mkdir(exist_ok=True)
 
         # Write metadata
         metadata = {
@@ -38,81 +75,104 @@ class SessionStorage:
             "description": description,
             "created_at": timestamp,
             "platform": "macos",
-            "config": config or {}
+            "config": config or {},
+            # Event timestamps = wall_t0 + (time.monotonic() - monotonic_t0).
+            "clock": {"wall_t0": self._clock_wall0, "monotonic_t0": self._clock_mono0},
         }
-        with open(self.metadata_path, "w") as f:
-            json.dump(metadata, f, indent=2)
-
-        print(f"Started session: {self.session_dir}")
+        # Written to a temp file and renamed into place, so a crash never leaves a truncated file.
+        tmp = self.metadata_path.with_suffix(self.metadata_path.suffix + ".tmp")
+        tmp.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+        tmp.replace(self.metadata_path)
+
+        self.close_session()
+        self._manifest_fh = open(self.manifest_path, "ab")
+
+    def close_session(self):
+        """Flush, fsync and close the manifest. Safe to call more than once."""
+        fh = self._manifest_fh
+        if fh is None:
+            return
+        self._manifest_fh = None
+        try:
+            fh.flush()
+            os.fsync(fh.fileno())
+        finally:
+            fh.close()
+
+    def timestamp(self, mono=None):
+        """
+        Wall-clock timestamp (epoch seconds) for a time.monotonic() reading, default now.
+        Anchored at session start; before a session starts this is just time.time().
+        """
+        if self._clock_mono0 is None:
+            return time.time()
+        if mono is None:
+            mono = time.monotonic()
+        return self._clock_wall0 + (mono - self._clock_mono0)
 
     def write_event(self, event_data):
         """Append an event to the manifest."""
-        if not self.manifest_path:
+        self.write_events([event_data])
+
+    def write_events(self, events, sync=False):
+        """
+        Append a batch of events to the manifest with a single write.
+        With sync=True the batch is also fsynced, so one fsync covers the whole batch.
+        """
+        fh = self._manifest_fh
+        if fh is None:
             raise RuntimeError("Session not started")
+        if not events:
+            return
 
-        # Ensure timestamp is present
-        if "timestamp" not in event_data:
-            event_data["timestamp"] = time.time()
+        lines = []
+        for event_data in events:
+            if "timestamp" not in event_data:
+                event_data["timestamp"] = self.timestamp()
+            lines.append(_dumps_line(event_data))
 
-        with open(self.manifest_path, "a") as f:
-            f.write(json.dumps(event_data) + "\n")
+        # The handle stays open for the session; flush per batch so readers see whole lines.
+        fh.write(b"\n".join(lines) + b"\n")
+        fh.flush()
+        if sync:
+            os.fsync(fh.fileno())
 
     def get_screenshot_path(self, filename=None):
-        """Get path for a new screenshot. If no filename, generates one based on counter."""
+        """Get path (str) for a new screenshot. If no filename, generates one based on counter."""
         if not filename:
             name = f"{self.screenshot_counter}.png"
             self.screenshot_counter += 1
         else:
             name = filename
-        return self.screenshots_dir / name
-
-    def get_current_screenshot_path(self):
-        """Path for the continuously-overwritten current screenshot."""
-        return self.screenshots_dir / "current_screenshot.png"
-
-    def get_pretyping_screenshot_path(self):
-        """Path for the screenshot captured at the start of a typing burst (overwritten per burst)."""
-        return self.screenshots_dir / "pretyping_screenshot.png"
+        return os.path.join(self._screenshots_dir_str, name)
 
-    def copy_file(self, src_path, dst_path):
-        """Copy a file to a destination path (best-effort). Returns dst_path or None."""
-        if not src_path or not dst_path:
-            return None
-        # Small retry to avoid transient races around writer replace/startup.
-        last_err = None
-        for _ in range(3):
-            try:
-                shutil.copy2(str(src_path), str(dst_path))
-                return dst_path
-            except Exception as e:
-                last_err = e
-                time.sleep(0.02)
-        print(f"Copy failed ({src_path} -> {dst_path}): {last_err}")
-        return None
-
-    def freeze_screenshot(self, src_path, filename=None):
+    def reserve_screenshot_path(self):
         """
-        Freeze a source screenshot into the numbered screenshots/ directory.
-        Uses copy (does not rename) so the source can keep being overwritten.
-        Returns relative path suitable for manifest, or None if it fails.
+        Reserve the next numbered screenshot. Returns (absolute path, manifest-relative path) as
+        strings, built from cached prefixes so the per-event cost is two string joins.
         """
-        if not src_path:
-            return None
-        dst_path = self.get_screenshot_path(filename=filename)
-        saved = self.copy_file(src_path, dst_path)
-        return self.get_relative_path(saved) if saved else None
+        if not self._screenshots_dir_str:
+            raise RuntimeError("Session not started")
+        name = f"{self.screenshot_counter}.png"
+        self.screenshot_counter += 1
+        return os.path.join(self._screenshots_dir_str, name), os.path.join(self._screenshots_rel, name)
 
     def get_audio_path(self, filename=None):
-        """Get path for a new audio clip."""
+        """Get path (str) for a new audio clip."""
         if not filename:
             name = f"{self.audio_counter}.wav"
             self.audio_counter += 1
         else:
             name = filename
-        return self.audio_dir / name
+        return os.path.join(self._audio_dir_str, name)
 
     def get_relative_path(self, absolute_path):
         """Convert absolute path to relative path from session dir for manifest."""
         if absolute_path is None:
             return None
-        return os.path.relpath(absolute_path, self.session_dir)
+        path = os.fspath(absolute_path)
+        prefix = self._session_dir_prefix
+        if prefix and path.startswith(prefix):
+            # Paths built by this class: strip the cached prefix instead of normalizing both sides.
+            return path[len(prefix):]
+        return os.path.relpath(path, self.session_dir)
@@ -5,6 +5,8 @@ import json
 import logging
 import os
 import re
+import threading
+from collections import Counter
 from lmnr import observe
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
@@ -17,9 +19,19 @@ from tqdm import tqdm  # type: ignore[import-not-found]
 from llm_resolver import LiteLLMChatClient, get_reflect_config
 from ai_mime.debug_log import log as debug_log
 
+try:
+    import orjson as _orjson
+except ImportError:  # optional speedup; stdlib json writes equivalent files
+    _orjson = None
+
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 2  # max retries after the first attempt
+# In-flight Pass A requests; each worker mostly waits on the network, so threads are cheap here.
+PASS_A_MAX_WORKERS = 10
+
+# Pass A appends finished step cards here and folds them into step_cards.json at the end of a run.
+STEP_CARDS_PARTIAL_NAME = "step_cards.partial.jsonl"
 
 
 PassAActionType = Literal[
@@ -100,18 +112,46 @@ def _png_data_url(path: Path) -> str:
     b64 = base64.b64encode(raw).decode("ascii")
     return f"data:image/png;base64,{b64}"
 
+def _dumps_json_indented(obj: Any) -> bytes:
+    """
+    UTF-8 JSON with 2-space indent. Equivalent JSON to json.dumps(obj, indent=2, ensure_ascii=False),
+    but not always the same bytes (e.g. orjson writes 1e-7 where json writes 1e-07).
+    """
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(obj, option=_orjson.OPT_INDENT_2)
+        except TypeError:
+            # Non-str keys, >64-bit ints, etc.: let json decide.
+            pass
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _dumps_json_line(obj: Any) -> bytes:
+    """Compact UTF-8 JSON on one line (no trailing newline), for append-only JSONL logs."""
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(obj)
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads_json(data: bytes) -> Any:
+    return _orjson.loads(data) if _orjson is not None else json.loads(data)
+
+
 def _write_json_atomic(path: Path, obj: Any) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp = path.with_suffix(path.suffix + ".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(obj, f, indent=2, ensure_ascii=False)
+    tmp.write_bytes(_dumps_json_indented(obj))
     tmp.replace(path)
 
 def _read_json_if_exists(path: Path) -> Any | None:
-    if not path.exists():
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
         return None
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return _loads_json(data)
 
 
 PASS_A_SYSTEM_PROMPT = """You convert a UI trace step (screenshots + action) into a reusable, coordinate-free step instruction
@@ -388,22 +428,35 @@ class StepInput:
     extract_var_name: str | None
     pre_screenshot: Path | None
     post_screenshot: Path | None
+    # Images sent for this step, in prompt order (PRE then POST), without the unset ones.
+    img_paths: tuple[Path, ...] = ()
+
+
+def _read_step_cards_log(path: Path) -> list[Any]:
+    """Cards appended to a Pass A partial log; a torn last line (crash mid-append) is skipped."""
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return []
+    out: list[Any] = []
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            out.append(_loads_json(line))
+        except ValueError:
+            continue
+    return out
 
 
 def _read_json(path: Path) -> dict[str, Any]:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return _loads_json(path.read_bytes())
 
 
 def _read_jsonl(path: Path) -> list[dict[str, Any]]:
-    out: list[dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            out.append(json.loads(line))
-    return out
+    # One read, then parse each line straight from bytes (no per-line str decode/strip).
+    loads = _orjson.loads if _orjson is not None else json.loads
+    return [loads(line) for line in path.read_bytes().splitlines() if line.strip()]
 
 
 def load_task_metadata(workflow_dir: str | os.PathLike[str]) -> tuple[str, str]:
@@ -500,6 +553,7 @@ def derive_step_inputs(workflow_dir: str | os.PathLike[str], events: list[dict[s
                 extract_var_name=extract_var_name,
                 pre_screenshot=pre_path,
                 post_screenshot=post_path,
+                img_paths=tuple(p for p in (pre_path, post_path) if p is not None),
             )
         )
         step_i += 1
@@ -528,18 +582,21 @@ def run_pass_a_step_cards(
 
     # Load any existing StepCards so reruns only attempt missing steps.
     step_cards_path = workflow_dir_p / "step_cards.json"
+    # Cards finished since step_cards.json was last written, appended one per line as they complete.
+    partial_path = workflow_dir_p / STEP_CARDS_PARTIAL_NAME
     def _load_existing_by_i() -> dict[int, dict[str, Any]]:
         existing_any = _read_json_if_exists(step_cards_path)
+        items = list(existing_any) if isinstance(existing_any, list) else []
+        items.extend(_read_step_cards_log(partial_path))
         existing_by_i: dict[int, dict[str, Any]] = {}
-        if isinstance(existing_any, list):
-            for item in existing_any:
-                if not isinstance(item, dict):
-                    continue
-                ii = item.get("i")
-                if isinstance(ii, int):
-                    existing_by_i[ii] = item
-                elif isinstance(ii, str) and ii.isdigit():
-                    existing_by_i[int(ii)] = item
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            ii = item.get("i")
+            if isinstance(ii, int):
+                existing_by_i[ii] = item
+            elif isinstance(ii, str) and ii.isdigit():
+                existing_by_i[int(ii)] = item
         return existing_by_i
 
     existing_by_i = _load_existing_by_i()
@@ -547,10 +604,11 @@ def run_pass_a_step_cards(
     pass_a_model = llm_cfg.pass_a_model or llm_cfg.model
     debug_log(f"Pass A: total_steps={len(steps)} existing={len(existing_by_i)} model={pass_a_model}")
     logger.info(
-        "Pass A: total_steps=%d existing=%d (model=%s) with up to 5 in-flight requests",
+        "Pass A: total_steps=%d existing=%d (model=%s) with up to %d in-flight requests",
         len(steps),
         len(existing_by_i),
         pass_a_model,
+        PASS_A_MAX_WORKERS,
     )
 
     # Resolve + cache LLM config once; reused across all Pass A steps (thread-safe usage).
@@ -562,18 +620,40 @@ def run_pass_a_step_cards(
         max_retries=MAX_RETRIES,
     )
 
+    # POST of step i is usually PRE of step i+1: encode each screenshot once per run.
+    data_urls: dict[Path, str] = {}
+    data_urls_lock = threading.Lock()
+    # Steps still to use each screenshot; an entry leaves the cache when its last step has taken it.
+    shot_uses: Counter[Path] = Counter()
+
+    def _data_url(p: Path) -> str:
+        with data_urls_lock:
+            url = data_urls.get(p)
+        if url is None:
+            # Encode outside the lock; two workers racing on the same path just encode it twice.
+            url = _png_data_url(p)
+            with data_urls_lock:
+                url = data_urls.setdefault(p, url)
+        return url
+
+    def _release_data_urls(paths: Iterable[Path]) -> None:
+        with data_urls_lock:
+            for p in paths:
+                shot_uses[p] -= 1
+                if shot_uses[p] <= 0:
+                    data_urls.pop(p, None)
+
+    # Screenshots of the missing steps that are not on disk; filled in before any step runs.
+    absent_shots: set[Path] = set()
+
     def _compile_one(s: StepInput) -> dict[str, Any]:
 
-        # Ensure screenshots exist if paths are set.
-        img_paths: list[Path] = []
-        if s.pre_screenshot is not None:
-            if not s.pre_screenshot.exists():
-                raise FileNotFoundError(f"PRE screenshot missing for step {s.i}: {s.pre_screenshot}")
-            img_paths.append(s.pre_screenshot)
-        if s.post_screenshot is not None:
-            if not s.post_screenshot.exists():
-                raise FileNotFoundError(f"POST screenshot missing for step {s.i}: {s.post_screenshot}")
-            img_paths.append(s.post_screenshot)
+        # Ensure screenshots exist if paths are set (checked once per run, see absent_shots).
+        if s.pre_screenshot in absent_shots:
+            raise FileNotFoundError(f"PRE screenshot missing for step {s.i}: {s.pre_screenshot}")
+        if s.post_screenshot in absent_shots:
+            raise FileNotFoundError(f"POST screenshot missing for step {s.i}: {s.post_screenshot}")
+        img_paths = s.img_paths
 
         user = PASS_A_USER_TEMPLATE.format(
             task_name=task_name,
@@ -588,9 +668,11 @@ def run_pass_a_step_cards(
             {
                 "role": "user",
                 "content": [{"type": "text", "text": user}]
-                + [{"type": "image_url", "image_url": {"url": _png_data_url(p)}} for p in img_paths],
+                + [{"type": "image_url", "image_url": {"url": _data_url(p)}} for p in img_paths],
             },
         ]
+        # messages keeps its own references; the cache only needs entries later steps will reuse.
+        _release_data_urls(img_paths)
 
         event = pass_a_client.create(
             response_model=StepCardModel,
@@ -610,20 +692,23 @@ def run_pass_a_step_cards(
         card["variable_name"] = vn
         return card
 
-    # Determine which step indices are missing.
-    missing = [s for s in steps if s.i not in existing_by_i]
-    if not missing:
-        debug_log("Pass A: all steps already present; skipping.")
-        logger.info("Pass A: all steps already present; skipping.")
-        return [existing_by_i[i] for i in range(len(steps))]
-
-    debug_log(f"Pass A: compiling {len(missing)} missing steps (will make LLM calls)")
-    logger.info("Pass A: compiling missing_steps=%d", len(missing))
-
     # Start from existing; add new results as they complete.
     results: dict[int, dict[str, Any]] = dict(existing_by_i)
+    partial_fh = None
+
+    def _append_partial(card: dict[str, Any]) -> None:
+        # One appended line per finished step instead of rewriting every card so far.
+        nonlocal partial_fh
+        if partial_fh is None:
+            partial_fh = partial_path.open("ab")
+        partial_fh.write(_dumps_json_line(card) + b"\n")
+        partial_fh.flush()
 
     def _persist_partial() -> None:
+        nonlocal partial_fh
+        if partial_fh is not None:
+            partial_fh.close()
+            partial_fh = None
         # Re-read any on-disk results and merge before writing to avoid accidental shrink/overwrite
         # (e.g., if multiple runs overlap or a previous run wrote more than this process has in memory).
         results.update(_load_existing_by_i())
@@ -631,22 +716,36 @@ def run_pass_a_step_cards(
         # Persist only the known cards (sorted by i). This format is stable and resume-friendly.
         ordered = [results[i] for i in sorted(results.keys())]
         _write_json_atomic(step_cards_path, ordered)
+        partial_path.unlink(missing_ok=True)
 
-    # Always persist whatever we already have before starting new calls.
-    _persist_partial()
+    # Determine which step indices are missing.
+    missing = [s for s in steps if s.i not in existing_by_i]
+    if not missing:
+        debug_log("Pass A: all steps already present; skipping.")
+        logger.info("Pass A: all steps already present; skipping.")
+        if partial_path.exists():
+            # A previous run finished the last steps but died before writing step_cards.json.
+            _persist_partial()
+        return [existing_by_i[i] for i in range(len(steps))]
+
+    # Stat each screenshot once: POST of step i is usually PRE of step i+1.
+    shot_uses.update(p for s in missing for p in s.img_paths)
+    absent_shots.update(p for p in shot_uses if not p.exists())
+
+    debug_log(f"Pass A: compiling {len(missing)} missing steps (will make LLM calls)")
+    logger.info("Pass A: compiling missing_steps=%d", len(missing))
 
     try:
-        with ThreadPoolExecutor(max_workers=10) as ex:
+        with ThreadPoolExecutor(max_workers=PASS_A_MAX_WORKERS) as ex:
             futures = {ex.submit(_compile_one, s): s for s in missing}
             with tqdm(total=len(futures), desc="Pass A", unit="step") as pbar:
                 for fut in as_completed(futures):
                     s = futures[fut]
                     try:
                         results[s.i] = fut.result()
-                        _persist_partial()
+                        _append_partial(results[s.i])
                     except Exception as e:
-                        # Persist completed work then exit so rerun only retries failures.
-                        _persist_partial()
+                        # Completed work is persisted below; rerun only retries failures.
                         raise RuntimeError(f"Pass A failed on step {s.i}: {e}") from e
                     finally:
                         pbar.update(1)
@@ -661,8 +760,11 @@ def run_pass_a_step_cards(
         _persist_partial()
         raise RuntimeError(f"Pass A incomplete after run; missing step indices: {missing_after}")
 
+    if partial_fh is not None:
+        partial_fh.close()
     ordered_final = [results[i] for i in range(len(steps))]
     _write_json_atomic(step_cards_path, ordered_final)
+    partial_path.unlink(missing_ok=True)
     return ordered_final
 
 
@@ -678,13 +780,17 @@ def run_pass_b_task_compiler(
     *,
     workflow_dir: str | os.PathLike[str],
     step_cards: list[dict[str, Any]],
+    task_name: str | None = None,
+    task_description_user: str | None = None,
 ) -> dict[str, Any]:
     """
     Pass B: compile task-level schema from step cards.
+    task_name/task_description_user are read from metadata.json unless the caller already has them.
     """
     workflow_dir_p = Path(workflow_dir)
     llm_cfg = get_reflect_config()
-    task_name, task_description_user = load_task_metadata(workflow_dir_p)
+    if task_name is None or task_description_user is None:
+        task_name, task_description_user = load_task_metadata(workflow_dir_p)
 
     pass_b_model = llm_cfg.pass_b_model or llm_cfg.model
     logger.info("Pass B: compiling task schema (model=%s)", pass_b_model)
@@ -1129,6 +1235,7 @@ def cleanup_reflect_artifacts(
 
     for name in (
         "step_cards.json",
+        STEP_CARDS_PARTIAL_NAME,
         "plan_creation.json",
         "schema.draft.json",
         "schema.draft.v1.json",
@@ -1244,13 +1351,10 @@ def extract_param_templates(step_cards: Iterable[dict[str, Any]]) -> set[str]:
     Note: Pass A no longer parameterizes step values, so this is primarily useful
     for legacy data / experiments where templates may still appear (e.g., in action_value).
     """
-    found: set[str] = set()
-    for c in step_cards:
-        s = c.get("action_value")
-        if isinstance(s, str):
-            for m in _TEMPLATE_RE.finditer(s):
-                found.add(m.group(1))
-    return found
+    values = (c.get("action_value") for c in step_cards)
+    # One scan over all values; a template can't span the newline separator.
+    joined = "\n".join(v for v in values if isinstance(v, str))
+    return set(_TEMPLATE_RE.findall(joined))
 
 
 @observe()
@@ -1365,7 +1469,12 @@ def compile_workflow_schema(
     else:
         _progress("reflect_progress", phase="pass_b_started", label="Understanding the Task", progress=45)
         debug_log("Pass B: starting task compilation...")
-        task_compiler_out = run_pass_b_task_compiler(workflow_dir=workflow_dir_p, step_cards=step_cards)
+        task_compiler_out = run_pass_b_task_compiler(
+            workflow_dir=workflow_dir_p,
+            step_cards=step_cards,
+            task_name=task_name,
+            task_description_user=task_description_user,
+        )
 
         plan_creation = dict(task_compiler_out)
         write_plan_creation(workflow_dir_p, plan_creation)
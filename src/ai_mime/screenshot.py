@@ -2,11 +2,26 @@ import mss
 import threading
 import os
 from io import BytesIO as _BytesIO
+from typing import NamedTuple
 
 import Quartz  # type: ignore[import-not-found]
 import AppKit  # type: ignore[import-not-found]
 
 
+class RawFrame(NamedTuple):
+    """
+    An unencoded screen capture: 32-bit BGRX/BGRA pixels, row stride in bytes, and the
+    logical (point) size the PNG should be saved at when it differs from the pixel size.
+
+    data is the capture backend's own buffer (not copied); it must not be modified once wrapped.
+    """
+    width: int
+    height: int
+    data: bytes | bytearray | memoryview
+    stride: int
+    target_size: tuple[int, int] | None = None
+
+
 class ScreenshotRecorder:
     def __init__(self):
         self.sct = mss.mss()
@@ -95,6 +110,103 @@ class ScreenshotRecorder:
         except Exception:
             return None
 
+    def _grab_quartz_below_window(self, *, below_window_id: int) -> RawFrame | None:
+        """
+        macOS-only: like _capture_quartz_below_window, but return the raw pixels instead of a file.
+        """
+        try:
+            win_id = int(below_window_id)
+            if win_id <= 0:
+                return None
+
+            display_id = getattr(Quartz, "CGMainDisplayID")()
+            bounds = getattr(Quartz, "CGDisplayBounds")(display_id)
+            cgimg = getattr(Quartz, "CGWindowListCreateImage")(
+                bounds,
+                getattr(Quartz, "kCGWindowListOptionOnScreenBelowWindow"),
+                win_id,
+                getattr(Quartz, "kCGWindowImageDefault"),
+            )
+            if cgimg is None:
+                return None
+
+            # Window-server images are 32bpp, little-endian premultiplied-first, i.e. BGRA in memory.
+            if int(getattr(Quartz, "CGImageGetBitsPerPixel")(cgimg)) != 32:
+                return None
+            src_w = int(getattr(Quartz, "CGImageGetWidth")(cgimg))
+            src_h = int(getattr(Quartz, "CGImageGetHeight")(cgimg))
+            stride = int(getattr(Quartz, "CGImageGetBytesPerRow")(cgimg))
+            provider = getattr(Quartz, "CGImageGetDataProvider")(cgimg)
+            # CGDataProviderCopyData already returns a private copy; wrap it instead of copying again.
+            data = memoryview(getattr(Quartz, "CGDataProviderCopyData")(provider))
+
+            # Normalize Retina captures to display points (see _capture_quartz_below_window).
+            try:
+                tgt_w = int(float(getattr(bounds, "size").width))  # type: ignore[attr-defined]
+                tgt_h = int(float(getattr(bounds, "size").height))  # type: ignore[attr-defined]
+            except Exception:
+                tgt_w = tgt_h = 0
+            target = (tgt_w, tgt_h) if tgt_w and tgt_h and (tgt_w, tgt_h) != (src_w, src_h) else None
+            return RawFrame(src_w, src_h, data, stride, target)
+        except Exception:
+            return None
+
+    def grab(self, *, exclude_window_id: int | None = None) -> RawFrame | None:
+        """
+        Capture the primary screen into memory without encoding it.
+        Same exclusion/fallback rules as capture(); use save_frame() to write a PNG.
+        Returns None if strict overlay exclusion failed; capture errors are raised to the caller
+        (the recorder's updater logs them rate-limited).
+        """
+        with self.lock:
+            if exclude_window_id is not None:
+                strict = (os.getenv("AI_MIME_STRICT_OVERLAY_EXCLUSION") or "").strip() in ("1", "true", "yes")
+
+                frame = self._grab_quartz_below_window(below_window_id=int(exclude_window_id))
+                if frame is not None:
+                    return frame
+
+                if strict:
+                    return None
+
+                if not self._warned_quartz_failed:
+                    self._warned_quartz_failed = True
+                    print("Quartz capture-below-window failed; falling back to mss screenshots (overlay may appear).")
+
+            shot = self.sct.grab(self.sct.monitors[1])
+            # mss allocates a fresh buffer per grab, so the frame can own it without a copy.
+            return RawFrame(shot.width, shot.height, shot.raw, shot.width * 4)
+
+    @staticmethod
+    def save_frame(frame: RawFrame, filepath) -> str:
+        """
+        Encode a RawFrame as PNG at filepath and return the filepath. Encode or write errors
+        propagate, so the caller decides how to report them.
+
+        Uses fast (level 1) compression. The PNG is encoded in memory and written with a single
+        write(), so a failed encode never leaves a partial file and the writer thread does one
+        syscall per screenshot instead of one per 64 KiB chunk.
+        """
+        from PIL import Image as _PILImage  # type: ignore[import-not-found]
+
+        # BGRX is not a layout PIL can share (frombuffer would copy too), so unpack straight to RGB.
+        im = _PILImage.frombytes("RGB", (frame.width, frame.height), frame.data, "raw", "BGRX", frame.stride, 1)
+        if frame.target_size is not None:
+            tgt_w, tgt_h = frame.target_size
+            factor = frame.width // tgt_w if tgt_w else 0
+            if factor > 1 and frame.width == tgt_w * factor and frame.height == tgt_h * factor:
+                # Retina -> points is an exact 2x (or 3x): a box reduce is ~15x faster than LANCZOS.
+                im = im.reduce(factor)
+            else:
+                resampling = getattr(_PILImage, "Resampling", None)
+                resample = getattr(resampling, "LANCZOS", 1) if resampling is not None else getattr(_PILImage, "LANCZOS", 1)
+                im = im.resize(frame.target_size, resample=resample)
+        buf = _BytesIO()
+        im.save(buf, format="PNG", compress_level=1, optimize=False)
+        with open(filepath, "wb", buffering=0) as f:
+            f.write(buf.getbuffer())
+        return str(filepath)
+
     def capture(self, filepath, *, exclude_window_id: int | None = None):
         """
         Capture the primary screen to the given filepath.
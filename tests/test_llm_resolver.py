@@ -618,6 +618,35 @@ class LLMResolverConfigTests(unittest.TestCase):
         self.assertEqual(result.ok, True)
         fallback.assert_not_called()
 
+    def test_structured_clients_share_one_openai_client(self) -> None:
+        class Answer(BaseModel):
+            ok: bool
+
+        class FakeResp:
+            output_parsed = Answer(ok=True)
+            output_text = '{"ok": true}'
+
+        class FakeResponses:
+            def parse(self, **_kwargs):  # type: ignore[no-untyped-def]
+                return FakeResp()
+
+        class FakeOpenAI:
+            instances = 0
+
+            def __init__(self, **_kwargs):  # type: ignore[no-untyped-def]
+                FakeOpenAI.instances += 1
+                self.responses = FakeResponses()
+
+        with patch.dict(os.environ, {"TEST_KEY": "sk-test"}, clear=True), patch(
+            "llm_resolver.client._load_openai",
+            return_value=FakeOpenAI,
+        ):
+            for model in ("openai/pass-a", "openai/pass-a", "openai/pass-b"):
+                client = LiteLLMChatClient(model=model, api_base=None, api_key_env="TEST_KEY")
+                client.create(response_model=Answer, messages=[{"role": "user", "content": "Return ok"}])
+
+        self.assertEqual(FakeOpenAI.instances, 1)
+
     def test_imports_are_sdk_lazy(self) -> None:
         module_names = [
             "llm_resolver",
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from ai_mime.reflect import schema_compiler
+from ai_mime.reflect.schema_compiler import run_pass_a_step_cards
+
+_CARD = {
+    "i": 0,
+    "expected_current_state": "screen",
+    "intent": "click",
+    "action_type": "CLICK",
+    "action_value": None,
+    "target": {"primary": "button", "fallback": None},
+    "post_action": ["changed"],
+}
+
+
+class FakeClient:
+    """Stands in for LiteLLMChatClient: records every create() call and returns one fixed card."""
+
+    create_kwargs: list[dict[str, Any]] = []
+
+    def __init__(self, **kwargs: Any):
+        pass
+
+    def create(self, **kwargs: Any) -> SimpleNamespace:
+        FakeClient.create_kwargs.append(kwargs)
+        return SimpleNamespace(model_dump=lambda: dict(_CARD))
+
+    @classmethod
+    def image_urls(cls) -> list[str]:
+        return [
+            item["image_url"]["url"]
+            for kwargs in cls.create_kwargs
+            for item in kwargs["messages"][1]["content"]
+            if item.get("type") == "image_url"
+        ]
+
+
+def _write_workflow(workflow_dir: Path, events: list[dict], screenshots: tuple[str, ...] = ()) -> None:
+    (workflow_dir / "metadata.json").write_text(json.dumps({"name": "Task", "description": "Do it"}), encoding="utf-8")
+    for name in screenshots:
+        (workflow_dir / name).write_bytes(name.encode())
+    (workflow_dir / "manifest.jsonl").write_text("".join(json.dumps(e) + "\n" for e in events), encoding="utf-8")
+
+
+def _run_pass_a(workflow_dir: Path) -> list[dict[str, Any]]:
+    llm_cfg = SimpleNamespace(
+        model="openai/test",
+        pass_a_model=None,
+        api_base=None,
+        api_key_env="MISSING_KEY",
+        extra_kwargs={},
+        pass_a_max_tokens=123,
+    )
+    with patch("ai_mime.reflect.schema_compiler.get_reflect_config", return_value=llm_cfg), patch(
+        "ai_mime.reflect.schema_compiler.LiteLLMChatClient",
+        FakeClient,
+    ):
+        return run_pass_a_step_cards(workflow_dir=workflow_dir)
+
+
+class PassAStepCardsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        FakeClient.create_kwargs = []
+
+    def test_pass_a_encodes_shared_pre_post_screenshot_once(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            workflow_dir = Path(td)
+            _write_workflow(
+                workflow_dir,
+                [
+                    {"action_type": "click", "screenshot": "0.png"},
+                    {"action_type": "click", "screenshot": "1.png"},
+                    {"action_type": "end", "screenshot": "2.png"},
+                ],
+                ("0.png", "1.png", "2.png"),
+            )
+            # One worker: concurrent workers may legitimately race and encode a shared shot twice.
+            with patch("ai_mime.reflect.schema_compiler.PASS_A_MAX_WORKERS", 1), patch(
+                "ai_mime.reflect.schema_compiler._png_data_url",
+                wraps=schema_compiler._png_data_url,
+            ) as encode:
+                cards = _run_pass_a(workflow_dir)
+
+        self.assertEqual([c["i"] for c in cards], [0, 1])
+        # 1.png is POST of step 0 and PRE of step 1: four image blocks from three encodes.
+        self.assertEqual(len(FakeClient.image_urls()), 4)
+        self.assertEqual(encode.call_count, 3)
+
+    def test_pass_a_resumes_from_partial_log_and_folds_it_into_step_cards(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            workflow_dir = Path(td)
+            _write_workflow(workflow_dir, [{"action_type": "click"}, {"action_type": "click"}])
+            # Step 0 finished in an earlier run that crashed mid-append on its next card.
+            partial = workflow_dir / schema_compiler.STEP_CARDS_PARTIAL_NAME
+            partial.write_text(json.dumps({"i": 0, "intent": "earlier"}) + "\n" + '{"i": 1, "int', encoding="utf-8")
+
+            cards = _run_pass_a(workflow_dir)
+
+            on_disk = json.loads((workflow_dir / "step_cards.json").read_text(encoding="utf-8"))
+            self.assertFalse(partial.exists())
+
+        self.assertEqual(len(FakeClient.create_kwargs), 1)
+        self.assertEqual([c["i"] for c in cards], [0, 1])
+        self.assertEqual(cards[0]["intent"], "earlier")
+        self.assertEqual(on_disk, cards)
+
+
+class SchemaCompilerJsonTests(unittest.TestCase):
+    def test_load_events_skips_blank_lines_and_accepts_crlf(self) -> None:
+        events = [{"action_type": "type", "action_details": {"text": "café ✓"}}, {"action_type": "end"}]
+        with tempfile.TemporaryDirectory() as td:
+            (Path(td) / "manifest.jsonl").write_bytes(
+                (json.dumps(events[0], ensure_ascii=False) + "\r\n\n" + json.dumps(events[1]) + "\n").encode("utf-8")
+            )
+            self.assertEqual(schema_compiler.load_events(td), events)
+            with patch("ai_mime.reflect.schema_compiler._orjson", None):
+                self.assertEqual(schema_compiler.load_events(td), events)
+
+    def test_step_cards_json_is_equivalent_with_and_without_orjson(self) -> None:
+        cards = [
+            {"i": 0, "intent": "Type café ✓", "post_action": ["changed"], "target": {}, "details": None},
+            {"i": 1, "action_value": 2.5, "post_action": [], "variable_name": "extract_0"},
+        ]
+        with tempfile.TemporaryDirectory() as td:
+            fast = schema_compiler.write_step_cards(Path(td) / "fast", cards).read_bytes()
+            with patch("ai_mime.reflect.schema_compiler._orjson", None):
+                plain = schema_compiler.write_step_cards(Path(td) / "plain", cards).read_bytes()
+
+        self.assertEqual(json.loads(fast), cards)
+        self.assertEqual(json.loads(plain), cards)
+        self.assertEqual(plain.decode("utf-8"), json.dumps(cards, indent=2, ensure_ascii=False))
+
+    def test_json_line_is_one_compact_line_with_and_without_orjson(self) -> None:
+        card = {"i": 3, "intent": "Type café ✓\nthen Enter", "post_action": []}
+        fast = schema_compiler._dumps_json_line(card)
+        with patch("ai_mime.reflect.schema_compiler._orjson", None):
+            plain = schema_compiler._dumps_json_line(card)
+
+        for line in (fast, plain):
+            self.assertNotIn(b"\n", line)
+            self.assertEqual(json.loads(line), card)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import importlib
+import json
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from ai_mime.record.storage import SessionStorage
+
+_KEY_NAMES = (
+    "cmd cmd_l cmd_r ctrl ctrl_l ctrl_r alt alt_l alt_r shift shift_l shift_r "
+    "enter tab esc f4 backspace delete space"
+).split()
+
+
+def _import_capture() -> types.ModuleType:
+    """Import ai_mime.record.capture with the macOS-only input/capture modules stubbed out."""
+    pynput = types.ModuleType("pynput")
+    pynput.keyboard = SimpleNamespace(  # type: ignore[attr-defined]
+        Key=SimpleNamespace(**{name: f"Key.{name}" for name in _KEY_NAMES}),
+        Listener=None,
+    )
+    pynput.mouse = SimpleNamespace(Listener=None)  # type: ignore[attr-defined]
+    mss = types.ModuleType("mss")
+    mss.mss = lambda: None  # type: ignore[attr-defined]
+    stubs = {"pynput": pynput, "mss": mss, "Quartz": types.ModuleType("Quartz"), "AppKit": types.ModuleType("AppKit")}
+    with patch.dict(sys.modules, stubs):
+        for name in ("ai_mime.record.capture", "ai_mime.screenshot"):
+            sys.modules.pop(name, None)
+        return importlib.import_module("ai_mime.record.capture")
+
+
+capture = _import_capture()
+
+
+class CharKey:
+    """Hashable stand-in for pynput's KeyCode."""
+
+    def __init__(self, char: str):
+        self.char = char
+
+
+class FakeGrabber:
+    """Stands in for ScreenshotRecorder.grab(): each capture is a new frame whose width is its sequence number."""
+
+    def __init__(self, delay_s: float = 0.0, gate: threading.Event | None = None):
+        self.delay_s = delay_s
+        self.gate = gate
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def grab(self, *, exclude_window_id=None):  # type: ignore[no-untyped-def]
+        if self.gate is not None:
+            self.gate.wait(2.0)
+        time.sleep(self.delay_s)
+        with self._lock:
+            self.count += 1
+            n = self.count
+        return capture.RawFrame(n, 1, bytes(4 * n), 4 * n)
+
+
+class CurrentScreenshotUpdaterTests(unittest.TestCase):
+    def _updater(self, grabber: FakeGrabber):  # type: ignore[no-untyped-def]
+        updater = capture.CurrentScreenshotUpdater(grabber, storage=None, interval_s=60.0)
+        updater.start()
+        self.addCleanup(updater.stop)
+        return updater
+
+    def test_fresh_frame_is_reused_without_a_new_capture(self) -> None:
+        grabber = FakeGrabber()
+        updater = self._updater(grabber)
+        first = updater.latest_frame()
+        captures = grabber.count
+
+        self.assertIs(updater.latest_frame(), first)
+        self.assertEqual(grabber.count, captures)
+
+    def test_freeze_after_refresh_waits_for_the_post_action_capture(self) -> None:
+        grabber = FakeGrabber(delay_s=0.03)
+        updater = self._updater(grabber)
+        before = updater.latest_frame()
+        self.assertIsNotNone(before)
+
+        # The frame is only milliseconds old, but it predates the refresh request.
+        updater.force_refresh()
+        after = updater.latest_frame()
+
+        self.assertIsNotNone(after)
+        self.assertGreater(after.width, before.width)  # type: ignore[union-attr]
+        self.assertTrue(updater.is_fresh())
+
+    def test_freeze_waiting_on_a_capture_cancelled_by_stop_falls_back(self) -> None:
+        release = threading.Event()
+        grabber = FakeGrabber(gate=release)
+        updater = capture.CurrentScreenshotUpdater(grabber, storage=None, interval_s=60.0)
+        updater.start()
+        while updater._inflight is None or not updater._inflight.running():
+            time.sleep(0.005)
+
+        # Queued behind the blocked capture, so stop() cancels it while the freeze waits on it.
+        updater.force_refresh()
+        errors: list[BaseException] = []
+
+        def freeze() -> None:
+            try:
+                updater.latest_frame()
+            except BaseException as e:
+                errors.append(e)
+
+        waiter = threading.Thread(target=freeze)
+        waiter.start()
+        time.sleep(0.05)
+        stopper = threading.Thread(target=updater.stop, kwargs={"timeout": 0.01})
+        stopper.start()
+        time.sleep(0.05)
+        release.set()
+        stopper.join(2.0)
+        waiter.join(2.0)
+
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(errors, [])
+
+
+class EventRecorderTests(unittest.TestCase):
+    def _recorder(self, grabber: FakeGrabber):  # type: ignore[no-untyped-def]
+        td = tempfile.TemporaryDirectory()
+        self.addCleanup(td.cleanup)
+        storage = SessionStorage(base_dir=td.name)
+        storage.start_session("demo")
+        recorder = capture.EventRecorder(storage)
+        recorder.current_updater.screenshot_recorder = grabber
+        recorder.recording = True
+        recorder.current_updater.start()
+        self.addCleanup(recorder.current_updater.stop)
+        return recorder
+
+    def _start_writer(self, recorder) -> None:  # type: ignore[no-untyped-def]
+        recorder._writer = threading.Thread(target=recorder._writer_loop, daemon=True)
+        recorder._writer.start()
+
+    def _queued(self, recorder):  # type: ignore[no-untyped-def]
+        frames = {}
+        events = []
+        for item in recorder._write_q:
+            if isinstance(item, dict):
+                events.append(item)
+            else:
+                frames[recorder.storage.get_relative_path(item[1])] = item[0]
+        return events, frames
+
+    def test_key_after_typing_freezes_the_post_typing_frame(self) -> None:
+        grabber = FakeGrabber(delay_s=0.03)
+        recorder = self._recorder(grabber)
+        recorder.current_updater.latest_frame()
+
+        for char in "hi":
+            recorder.on_press(CharKey(char))
+        recorder.on_press(capture.keyboard.Key.enter)
+
+        events, frames = self._queued(recorder)
+        self.assertEqual([e["action_type"] for e in events], ["type", "key"])
+        typed_frame = frames[events[0]["screenshot"]]
+        key_frame = frames[events[1]["screenshot"]]
+        # The Enter screenshot must show the typed text, i.e. come from a capture after the flush.
+        self.assertGreater(key_frame.width, typed_frame.width)
+
+    def test_writer_encodes_each_screenshot_before_its_manifest_line(self) -> None:
+        recorder = self._recorder(FakeGrabber())
+        storage = recorder.storage
+        missing_at_write: list[str] = []
+        write_events = storage.write_events
+
+        def checked_write_events(events, sync=False):  # type: ignore[no-untyped-def]
+            for event in events:
+                if not (storage.session_dir / event["screenshot"]).is_file():
+                    missing_at_write.append(event["screenshot"])
+            return write_events(events, sync=sync)
+
+        storage.write_events = checked_write_events
+        self._start_writer(recorder)
+        for char in "ok":
+            recorder.on_press(CharKey(char))
+        recorder.on_press(capture.keyboard.Key.enter)
+        recorder.on_press(capture.keyboard.Key.tab)
+        recorder.stop()
+
+        lines = Path(storage.manifest_path).read_text(encoding="utf-8").splitlines()
+        events = [json.loads(line) for line in lines]
+        self.assertEqual([e["action_type"] for e in events], ["type", "key", "key"])
+        self.assertEqual(
+            [e["screenshot"] for e in events],
+            ["screenshots/0.png", "screenshots/1.png", "screenshots/2.png"],
+        )
+        self.assertEqual(missing_at_write, [])
+
+    def test_frame_dropped_from_full_queue_clears_its_screenshot(self) -> None:
+        recorder = self._recorder(FakeGrabber())
+        recorder._max_queued_frames = 1
+        for key in ("ENTER", "TAB"):
+            screenshot = recorder._freeze_current_screenshot()
+            recorder._write_event({"action_type": "key", "action_details": {"key": key}, "screenshot": screenshot})
+
+        self._start_writer(recorder)
+        recorder.stop()
+
+        lines = Path(recorder.storage.manifest_path).read_text(encoding="utf-8").splitlines()
+        events = [json.loads(line) for line in lines]
+        self.assertEqual([e["screenshot"] for e in events], [None, "screenshots/1.png"])
+        self.assertFalse((recorder.storage.session_dir / "screenshots/0.png").exists())
+        self.assertTrue((recorder.storage.session_dir / "screenshots/1.png").is_file())
+
+    def test_encode_failures_are_logged_once_per_interval(self) -> None:
+        recorder = self._recorder(FakeGrabber())
+        recorder.screenshot_recorder = SimpleNamespace(save_frame=Mock(side_effect=OSError("disk full")))
+        for key in ("ENTER", "TAB"):
+            screenshot = recorder._freeze_current_screenshot()
+            recorder._write_event({"action_type": "key", "action_details": {"key": key}, "screenshot": screenshot})
+
+        with self.assertLogs(capture.logger, level="WARNING") as logs:
+            self._start_writer(recorder)
+            recorder.stop()
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("disk full", logs.output[0])
+        lines = Path(recorder.storage.manifest_path).read_text(encoding="utf-8").splitlines()
+        self.assertEqual([json.loads(line)["screenshot"] for line in lines], [None, None])
+
+    def test_linger_deadline_flushes_events_between_queued_encodes(self) -> None:
+        recorder = self._recorder(FakeGrabber())
+
+        def slow_save_frame(frame, path):  # type: ignore[no-untyped-def]
+            time.sleep(0.1)
+            return path
+
+        recorder.screenshot_recorder = SimpleNamespace(save_frame=slow_save_frame)
+        written_at: list[float] = []
+        write_events = recorder.storage.write_events
+
+        def timed_write_events(events, sync=False):  # type: ignore[no-untyped-def]
+            written_at.append(time.monotonic())
+            return write_events(events, sync=sync)
+
+        recorder.storage.write_events = timed_write_events
+        recorder._write_event({"action_type": "click", "screenshot": None})
+        frame = recorder.current_updater.latest_frame()
+        for _ in range(10):
+            recorder._enqueue_write((frame, recorder.storage.reserve_screenshot_path()[0]))
+
+        started = time.monotonic()
+        self._start_writer(recorder)
+        recorder.stop()
+
+        # The click is written after at most one encode, not behind all ten (~1s).
+        self.assertLess(written_at[0] - started, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
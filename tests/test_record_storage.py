@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ai_mime.record.storage import SessionStorage
+
+
+def _read_manifest(storage: SessionStorage) -> list[dict]:
+    lines = Path(storage.manifest_path).read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+class SessionStorageTests(unittest.TestCase):
+    def test_write_events_appends_batch_in_order(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            storage = SessionStorage(base_dir=td)
+            storage.start_session("demo")
+            storage.write_event({"action_type": "click", "timestamp": 1.0})
+            storage.write_events(
+                [
+                    {"action_type": "type", "timestamp": 2.0},
+                    {"action_type": "key"},
+                ]
+            )
+
+            events = _read_manifest(storage)
+            self.assertEqual([e["action_type"] for e in events], ["click", "type", "key"])
+            self.assertIn("timestamp", events[2])
+
+    def test_write_events_sync_fsyncs_once_per_batch(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            storage = SessionStorage(base_dir=td)
+            storage.start_session("demo")
+            with mock.patch("ai_mime.record.storage.os.fsync") as fsync:
+                storage.write_events([{"action_type": "click"}, {"action_type": "key"}], sync=True)
+                storage.write_events([{"action_type": "scroll"}])
+
+            self.assertEqual(fsync.call_count, 1)
+            self.assertEqual(len(_read_manifest(storage)), 3)
+
+    def test_manifest_lines_match_with_and_without_orjson(self) -> None:
+        event = {"action_type": "type", "action_details": {"text": "café ✓"}, "timestamp": 1.5}
+        with tempfile.TemporaryDirectory() as td:
+            storage = SessionStorage(base_dir=td)
+            storage.start_session("demo")
+            storage.write_events([dict(event)])
+            with mock.patch("ai_mime.record.storage._orjson", None):
+                storage.write_events([dict(event)])
+            storage.close_session()
+
+            lines = Path(storage.manifest_path).read_bytes().splitlines()
+            self.assertEqual(lines[0], lines[1])
+            self.assertEqual(json.loads(lines[1]), event)
+
+    def test_session_folder_keeps_unicode_letters_and_drops_punctuation(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            storage = SessionStorage(base_dir=td)
+            storage.start_session(" Café run/2: ok-ish_v2? ")
+
+            self.assertTrue(storage.session_dir.name.endswith("-Café_run2_ok-ish_v2"))
+
+    def test_timestamps_follow_the_monotonic_clock_from_the_session_anchor(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            storage = SessionStorage(base_dir=td)
+            storage.start_session("demo")
+            clock = json.loads(Path(storage.metadata_path).read_text(encoding="utf-8"))["clock"]
+
+            self.assertAlmostEqual(storage.timestamp(clock["monotonic_t0"] + 2.5), clock["wall_t0"] + 2.5, places=6)
+            # A wall-clock step after the session started does not move event timestamps.
+            with mock.patch("ai_mime.record.storage.time.time", return_value=0.0):
+                storage.write_events([{"action_type": "click"}])
+            self.assertGreaterEqual(_read_manifest(storage)[0]["timestamp"], clock["wall_t0"])
+
+    def test_close_session_fsyncs_and_rejects_later_writes(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            storage = SessionStorage(base_dir=td)
+            storage.start_session("demo")
+            storage.write_events([{"action_type": "click"}])
+            with mock.patch("ai_mime.record.storage.os.fsync") as fsync:
+                storage.close_session()
+                storage.close_session()
+
+            self.assertEqual(fsync.call_count, 1)
+            self.assertEqual(len(_read_manifest(storage)), 1)
+            with self.assertRaises(RuntimeError):
+                storage.write_events([{"action_type": "key"}])
+
+    def test_reserve_screenshot_path_numbers_screenshots_in_order(self) -> None:
+        with tempfile.TemporaryDirectory() as td:
+            storage = SessionStorage(base_dir=td)
+            storage.start_session("demo")
+
+            first = storage.reserve_screenshot_path()
+            abs_path, rel_path = storage.reserve_screenshot_path()
+
+            self.assertEqual(first[1], "screenshots/0.png")
+            self.assertEqual(rel_path, "screenshots/1.png")
+            self.assertEqual(Path(abs_path), storage.session_dir / rel_path)
+            self.assertEqual(storage.get_relative_path(abs_path), rel_path)
+            # Reserving only hands out the name; the recorder's writer thread creates the file.
+            self.assertFalse(Path(abs_path).exists())
+
+if __name__ == "__main__":
+    unittest.main()